@@ -1,14 +1,14 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
 from db.models import Action
 from db.schemas import ActionSchema, ActionUpdateSchema
-from db.session import SessionLocal
+from db.session import get_db
 
 router = APIRouter()
 
 
 @router.post("/actions")
-def create_action(action: ActionSchema):
-    db = SessionLocal()
+def create_action(action: ActionSchema, db: Session = Depends(get_db)):
     if db.query(Action).filter(Action.name == action.name).first():
         raise HTTPException(status_code=409, detail="Action already exists")
     db.add(Action(name=action.name, type=action.type, config=action.config))
@@ -17,8 +17,7 @@ def create_action(action: ActionSchema):
 
 
 @router.put("/actions/{name}")
-def update_action(name: str, update: ActionUpdateSchema):
-    db = SessionLocal()
+def update_action(name: str, update: ActionUpdateSchema, db: Session = Depends(get_db)):
     action = db.query(Action).filter(Action.name == name).first()
     if not action:
         raise HTTPException(status_code=404, detail="Action not found")
@@ -29,8 +28,7 @@ def update_action(name: str, update: ActionUpdateSchema):
 
 
 @router.get("/actions/{name}", response_model=ActionSchema)
-def get_action(name: str):
-    db = SessionLocal()
+def get_action(name: str, db: Session = Depends(get_db)):
     action = db.query(Action).filter(Action.name == name).first()
     if not action:
         raise HTTPException(status_code=404, detail="Action not found")
@@ -38,8 +36,7 @@ def get_action(name: str):
 
 
 @router.put("/actions/{name}")
-def update_action(name: str, update: ActionSchema):
-    db = SessionLocal()
+def update_action(name: str, update: ActionSchema, db: Session = Depends(get_db)):
     action = db.query(Action).filter(Action.name == name).first()
     if not action:
         raise HTTPException(status_code=404, detail="Action not found")
@@ -50,8 +47,7 @@ def update_action(name: str, update: ActionSchema):
 
 
 @router.delete("/actions/{name}")
-def delete_action(name: str):
-    db = SessionLocal()
+def delete_action(name: str, db: Session = Depends(get_db)):
     action = db.query(Action).filter(Action.name == name).first()
     if action:
         db.delete(action)
@@ -61,6 +57,5 @@ def delete_action(name: str):
 
 
 @router.get("/actions")
-def list_actions():
-    db = SessionLocal()
+def list_actions(db: Session = Depends(get_db)):
     return db.query(Action).all()
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+from core import profiling
+import config
+
+router = APIRouter()
+
+
+@router.get("/admin/loop-lag")
+async def loop_lag():
+    return profiling.loop_lag_monitor.snapshot()
+
+
+@router.post("/admin/profile", response_class=PlainTextResponse)
+async def profile(seconds: float = 10):
+    """Samples step execution and resumer sweeps in this process for
+    `seconds` and returns folded stacks, e.g. for flamegraph.pl"""
+    if not 0 < seconds <= config.PROFILE_MAX_SECONDS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"seconds must be in (0, {config.PROFILE_MAX_SECONDS}]",
+        )
+    try:
+        sampler = await profiling.profile(seconds)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(
+        sampler.collapsed(),
+        headers={
+            "X-Samples-Total": str(sampler.samples_total),
+            "X-Samples-Matched": str(sum(sampler.counts.values())),
+        },
+    )
@@ -0,0 +1,39 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from core.archiver import load_archived_job
+from db.models import ArchivedJob
+from db.session import get_db
+
+router = APIRouter()
+
+
+@router.get("/archive/jobs")
+async def list_archived_jobs(
+    day: Optional[str] = None,
+    workflow_name: Optional[str] = None,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+):
+    query = db.query(ArchivedJob)
+    if day:
+        query = query.filter(ArchivedJob.archived_on == day)
+    if workflow_name:
+        query = query.filter(ArchivedJob.workflow_name == workflow_name)
+    return [
+        {
+            "job_id": job.id,
+            "workflow_name": job.workflow_name,
+            "status": job.status,
+            "archived_on": job.archived_on,
+        }
+        for job in query.limit(limit).all()
+    ]
+
+
+@router.get("/archive/jobs/{job_id}")
+async def get_archived_job(job_id: str, db: Session = Depends(get_db)):
+    archived = db.query(ArchivedJob).filter(ArchivedJob.id == job_id).first()
+    if not archived:
+        raise HTTPException(status_code=404, detail="Archived job not found")
+    return load_archived_job(archived)
@@ -1,61 +1,257 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from api.responses import CodecJSONResponse
+from core import codec, job_utils
+from core.archiver import TERMINAL_STATUSES
+from core.dispatcher import dispatcher
+from core.events import job_events, status_event
 from core.executor import FlowExecutor
-from db.models import Job
-from db.session import SessionLocal
-from db.schemas import JobRequest, JobStatus
+from core.job_control import (
+    CANCELLED,
+    PAUSED,
+    STOPPING,
+    resume_paused_job,
+    stop_job,
+    stop_local,
+)
+from core.signals import AWAITING_SIGNAL, deliver_signal
+from core.workflow import WorkflowError, get_plan
+from db.models import Action, Job
+from db.session import get_db, session_scope
+from db.schemas import JobRequest, JobStatus, SignalRequest
+import config
 import asyncio
+import re
 import uuid
 
 router = APIRouter()
 
 
 @router.post("/jobs", response_model=JobStatus)
-async def start_job(request: JobRequest):
+async def start_job(request: JobRequest, db: Session = Depends(get_db)):
+    try:
+        plan = get_plan(request.steps)
+    except WorkflowError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
     job_id = str(uuid.uuid4())
-    db = SessionLocal()
+    found = {
+        name
+        for (name,) in db.query(Action.name)
+        .filter(Action.name.in_(plan.action_names))
+        .all()
+    }
+    missing = sorted(plan.action_names - found)
+    if missing:
+        raise HTTPException(
+            status_code=422, detail=[f"Unknown action '{name}'" for name in missing]
+        )
     job = Job(
         id=job_id,
         workflow_name=request.workflow_name,
         status="SCHEDULED",
         context=request.parameters,
         steps=request.steps,
+        priority=request.priority,
     )
     db.add(job)
     db.commit()
     db.refresh(job)
     executor = FlowExecutor(request.steps, request.parameters, job_id)
-    asyncio.create_task(executor.run())
+    dispatcher.submit(job_id, request.workflow_name, executor.run, request.priority)
     return JobStatus(job_id=job_id, status=job.status, context=job.context)
 
 
 @router.get("/jobs/{job_id}/steps")
-async def get_job_steps(job_id: str):
-    db = SessionLocal()
+async def get_job_steps(job_id: str, db: Session = Depends(get_db)):
     job = db.query(Job).filter(Job.id == job_id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return job.steps
 
 
+_WAIT_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)(ms|s|m)?$")
+_WAIT_UNITS = {"ms": 0.001, "s": 1, "m": 60, None: 1}
+
+
+def _parse_wait(wait: str) -> float:
+    match = _WAIT_PATTERN.match(wait.strip())
+    if not match:
+        raise HTTPException(
+            status_code=422, detail="wait must look like '30s', '500ms' or '1m'"
+        )
+    seconds = float(match.group(1)) * _WAIT_UNITS[match.group(2)]
+    return min(seconds, config.LONG_POLL_MAX_SECONDS)
+
+
 @router.get("/jobs/{job_id}", response_model=JobStatus)
-async def get_job_status(job_id: str):
-    db = SessionLocal()
+async def get_job_status(
+    job_id: str, wait: Optional[str] = None, db: Session = Depends(get_db)
+):
+    timeout = _parse_wait(wait) if wait else 0
+    # Subscribe before reading so a change between the read and the wait is not lost
+    with job_events.subscribe(job_id) as queue:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        if timeout <= 0 or job.status in TERMINAL_STATUSES:
+            return JobStatus(job_id=job.id, status=job.status, context=job.context)
+
+        status = job.status
+        db.rollback()  # give the connection back to the pool while we wait
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                event = await asyncio.wait_for(queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if event["type"] == "status" and event["status"] != status:
+                break
+
     job = db.query(Job).filter(Job.id == job_id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return JobStatus(job_id=job.id, status=job.status, context=job.context)
 
 
+def _sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {codec.dumps(event)}\n\n"
+
+
+def _current_status(job_id: str) -> Optional[dict]:
+    with session_scope() as session:
+        job = session.get(Job, job_id)
+        if job is None:
+            return None
+        return status_event(job.id, job.status, job.current_step_id, job.message)
+
+
+async def _job_event_stream(job_id: str):
+    with job_events.subscribe(job_id) as queue:
+        event = _current_status(job_id)
+        if event is None:
+            return
+        seen = (event["status"], event["step"])
+        yield _sse(event)
+
+        while event["type"] != "status" or event["status"] not in TERMINAL_STATUSES:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), config.SSE_KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                # Changes made by other processes (a worker resuming a wait)
+                # are never published here, so check the row itself
+                event = _current_status(job_id)
+                if event is None:
+                    return  # Deleted
+                if (event["status"], event["step"]) == seen:
+                    yield ": keepalive\n\n"  # stops proxies closing an idle stream
+                    continue
+            if event["type"] == "status":
+                seen = (event["status"], event["step"])
+            yield _sse(event)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, db: Session = Depends(get_db)):
+    if not db.query(Job.id).filter(Job.id == job_id).first():
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        _job_event_stream(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+def _resume_signalled_job(db: Session, job_id: str):
+    job = db.query(Job).filter(Job.id == job_id).first()
+    executor = FlowExecutor(job.steps, job_utils.get_parameters(job), job_id)
+    executor.restore_checkpoint(job.context, job_utils.get_resume_index(job))
+    dispatcher.submit(job_id, job.workflow_name, executor.run, job.priority or 0)
+
+
+@router.post("/jobs/{job_id}/signal")
+async def signal_job(job_id: str, signal: SignalRequest, db: Session = Depends(get_db)):
+    outcome = deliver_signal(db, job_id, signal.payload)
+    if outcome == "resumed":
+        _resume_signalled_job(db, job_id)
+        return {"job_id": job_id, "status": "RESUMED"}
+    if outcome == "buffered":
+        # The job has not reached its signal step yet; it picks this up there
+        return CodecJSONResponse(
+            status_code=202, content={"job_id": job_id, "status": "BUFFERED"}
+        )
+    if not db.query(Job).filter(Job.id == job_id).first():
+        raise HTTPException(status_code=404, detail="Job not found")
+    raise HTTPException(status_code=409, detail="Job is not waiting for a signal")
+
+
+@router.post("/signals/{correlation_key}")
+async def signal_by_key(
+    correlation_key: str, signal: SignalRequest, db: Session = Depends(get_db)
+):
+    job_ids = [
+        job_id
+        for (job_id,) in db.query(Job.id).filter(
+            Job.correlation_key == correlation_key, Job.status == AWAITING_SIGNAL
+        )
+    ]
+    resumed = []
+    for job_id in job_ids:
+        if deliver_signal(db, job_id, signal.payload, buffer=False) == "resumed":
+            _resume_signalled_job(db, job_id)
+            resumed.append(job_id)
+    if not resumed:
+        raise HTTPException(
+            status_code=404, detail="No job is waiting for this correlation key"
+        )
+    return {"resumed": resumed}
+
+
+def _stop(db: Session, job_id: str, status: str):
+    outcome = stop_job(db, job_id, status)
+    if outcome == "stopping":
+        # Its executor stops after the current step (or abandons an HTTP call)
+        return CodecJSONResponse(
+            status_code=202, content={"job_id": job_id, "status": STOPPING[status]}
+        )
+    if outcome == "stopped":
+        return {"job_id": job_id, "status": status}
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    raise HTTPException(status_code=409, detail=f"Job is already {job.status}")
+
+
 @router.post("/jobs/{job_id}/pause")
-async def pause_job(job_id: str):
-    return {"message": "Pause functionality not yet implemented."}
+async def pause_job(job_id: str, db: Session = Depends(get_db)):
+    return _stop(db, job_id, PAUSED)
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str, db: Session = Depends(get_db)):
+    return _stop(db, job_id, CANCELLED)
+
+
+@router.post("/jobs/{job_id}/resume")
+async def resume_job(job_id: str, db: Session = Depends(get_db)):
+    status = resume_paused_job(db, job_id)
+    if status:
+        return {"job_id": job_id, "status": status}
+    if not db.query(Job).filter(Job.id == job_id).first():
+        raise HTTPException(status_code=404, detail="Job not found")
+    raise HTTPException(status_code=409, detail="Job is not paused")
 
 
 @router.delete("/jobs/{job_id}")
-async def delete_job(job_id: str):
-    db = SessionLocal()
+async def delete_job(job_id: str, db: Session = Depends(get_db)):
     job = db.query(Job).filter(Job.id == job_id).first()
     if job:
+        # Don't leave an executor running against a row that no longer exists
+        stop_local(job_id, CANCELLED)
         db.delete(job)
         db.commit()
         return {"message": f"Job {job_id} deleted."}
@@ -63,8 +259,7 @@ async def delete_job(job_id: str):
 
 
 @router.get("/jobs")
-async def list_jobs():
-    db = SessionLocal()
+async def list_jobs(db: Session = Depends(get_db)):
     jobs = db.query(Job).all()
     return [
         {"job_id": job.id, "status": job.status, "context": job.context} for job in jobs
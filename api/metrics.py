@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from core.dispatcher import dispatcher
+from db.session import get_pool_status
+
+router = APIRouter()
+
+
+@router.get("/metrics/db")
+async def db_metrics():
+    return get_pool_status()
+
+
+@router.get("/metrics/queues")
+async def queue_metrics():
+    return dispatcher.snapshot()
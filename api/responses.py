@@ -0,0 +1,10 @@
+from typing import Any
+from fastapi.responses import JSONResponse
+from core import codec
+
+
+class CodecJSONResponse(JSONResponse):
+    """JSONResponse rendered with the configured codec (orjson when available)"""
+
+    def render(self, content: Any) -> bytes:
+        return codec.dumpb(content)
@@ -0,0 +1,108 @@
+from typing import Any, Dict, List
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from core import clock, cron
+from core.scheduler import next_fire_time
+from core.workflow import WorkflowError, get_plan
+from db.models import Action, Schedule
+from db.schemas import ScheduleSchema, ScheduleUpdateSchema
+from db.session import get_db
+
+router = APIRouter()
+
+
+def _validate(db: Session, schedule: ScheduleUpdateSchema) -> List[str]:
+    if (schedule.cron is None) == (schedule.interval_seconds is None):
+        return ["Exactly one of 'cron' or 'interval_seconds' is required"]
+    if schedule.interval_seconds is not None and schedule.interval_seconds <= 0:
+        return ["'interval_seconds' must be positive"]
+    if schedule.cron is not None:
+        try:
+            cron.parse(schedule.cron)
+        except ValueError as e:
+            return [str(e)]
+    try:
+        plan = get_plan(schedule.steps)
+    except WorkflowError as e:
+        return e.errors
+    found = {
+        name
+        for (name,) in db.query(Action.name)
+        .filter(Action.name.in_(plan.action_names))
+        .all()
+    }
+    return [f"Unknown action '{name}'" for name in sorted(plan.action_names - found)]
+
+
+def _apply(schedule: Schedule, values: ScheduleUpdateSchema):
+    for field, value in values.model_dump(exclude={"name"}).items():
+        setattr(schedule, field, value)
+    now = clock.now()
+    schedule.next_fire_at = next_fire_time(schedule, now) if values.enabled else None
+    schedule.updated_at = now
+
+
+def _to_dict(schedule: Schedule) -> Dict[str, Any]:
+    return {
+        "name": schedule.name,
+        "workflow_name": schedule.workflow_name,
+        "cron": schedule.cron,
+        "interval_seconds": schedule.interval_seconds,
+        "priority": schedule.priority,
+        "misfire_policy": schedule.misfire_policy,
+        "enabled": schedule.enabled,
+        "next_fire_at": schedule.next_fire_at,
+        "last_fired_at": schedule.last_fired_at,
+    }
+
+
+@router.post("/schedules")
+def create_schedule(schedule: ScheduleSchema, db: Session = Depends(get_db)):
+    if db.query(Schedule).filter(Schedule.name == schedule.name).first():
+        raise HTTPException(status_code=409, detail="Schedule already exists")
+    errors = _validate(db, schedule)
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+    record = Schedule(name=schedule.name)
+    _apply(record, schedule)
+    db.add(record)
+    db.commit()
+    return _to_dict(record)
+
+
+@router.put("/schedules/{name}")
+def update_schedule(
+    name: str, update: ScheduleUpdateSchema, db: Session = Depends(get_db)
+):
+    record = db.query(Schedule).filter(Schedule.name == name).first()
+    if not record:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    errors = _validate(db, update)
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+    _apply(record, update)
+    db.commit()
+    return _to_dict(record)
+
+
+@router.get("/schedules/{name}")
+def get_schedule(name: str, db: Session = Depends(get_db)):
+    record = db.query(Schedule).filter(Schedule.name == name).first()
+    if not record:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return {**_to_dict(record), "steps": record.steps, "parameters": record.parameters}
+
+
+@router.delete("/schedules/{name}")
+def delete_schedule(name: str, db: Session = Depends(get_db)):
+    record = db.query(Schedule).filter(Schedule.name == name).first()
+    if record:
+        db.delete(record)
+        db.commit()
+        return {"message": f"Schedule '{name}' deleted"}
+    raise HTTPException(status_code=404, detail="Schedule not found")
+
+
+@router.get("/schedules")
+def list_schedules(db: Session = Depends(get_db)):
+    return [_to_dict(schedule) for schedule in db.query(Schedule).all()]
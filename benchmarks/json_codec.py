@@ -0,0 +1,81 @@
+"""Micro-benchmark: JSON CPU time spent on one job, per codec.
+
+Models the JSON work a typical job does: the context and steps are
+encoded when the job is created and after each of its steps, decoded when
+a resumer or recovery picks it up, and encoded once more for GET /jobs/{id}.
+
+    python -m benchmarks.json_codec [--steps 6] [--outputs-kb 20] [--jobs 2000]
+"""
+
+import argparse
+import json
+import time
+
+from core.codec import _OrjsonCodec, _StdlibCodec, orjson
+
+
+def make_job(steps: int, outputs_kb: int):
+    item = {
+        "id": 0,
+        "key": "ABC-123",
+        "status": "Done",
+        "score": 0.75,
+        "tags": ["a", "b"],
+    }
+    per_output = max(1, outputs_kb * 1024 // len(json.dumps(item)) // steps)
+    context = {
+        "context": {"ticket_id": "ABC-123", "user_id": 42},
+        "meta": {"job_id": "job-1", "start_time": "2026-01-01T00:00:00+00:00",
+                 "step_retries": {}},  # fmt: skip
+        "output": {
+            f"step{i}": {"items": [dict(item, id=n) for n in range(per_output)]}
+            for i in range(steps)
+        },
+    }
+    workflow = [
+        {"id": f"step{i}", "type": "task", "action": "FetchTodo"} for i in range(steps)
+    ]
+    return context, workflow
+
+
+def one_job(codec, context, workflow, steps: int):
+    codec.dumps(workflow)
+    for _ in range(steps + 1):  # create + persist after every step
+        codec.dumps(context)
+    codec.loads(codec.dumps(context))  # resume / recovery read
+    codec.dumpb({"job_id": "job-1", "status": "COMPLETED", "context": context})
+
+
+def measure(codec, context, workflow, steps: int, jobs: int) -> float:
+    one_job(codec, context, workflow, steps)  # warm up
+    start = time.process_time()
+    for _ in range(jobs):
+        one_job(codec, context, workflow, steps)
+    return (time.process_time() - start) / jobs * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=6)
+    parser.add_argument("--outputs-kb", type=int, default=20)
+    parser.add_argument("--jobs", type=int, default=2000)
+    args = parser.parse_args()
+
+    context, workflow = make_job(args.steps, args.outputs_kb)
+    size = len(json.dumps(context))
+    print(f"context: {size / 1024:.1f} KB, {args.steps} steps, {args.jobs} jobs")
+
+    baseline = measure(_StdlibCodec, context, workflow, args.steps, args.jobs)
+    print(f"{'json':>8}: {baseline:9.1f} us CPU per job")
+    if orjson is None:
+        print("  orjson: not installed")
+        return
+    fast = measure(_OrjsonCodec, context, workflow, args.steps, args.jobs)
+    print(
+        f"{'orjson':>8}: {fast:9.1f} us CPU per job "
+        f"({baseline - fast:.1f} us saved, {baseline / fast:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
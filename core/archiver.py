@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy import func
+import config
+from core import clock, codec
+from db.models import ArchivedJob, Job
+from db.session import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("COMPLETED", "FAILED", "CANCELLED")
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def compress_job(job: Job) -> bytes:
+    record = {
+        "job_id": job.id,
+        "workflow_name": job.workflow_name,
+        "status": job.status,
+        "message": job.message,
+        "current_step_id": job.current_step_id,
+        "context": job.context,
+        "steps": job.steps,
+        "step_retry_counts": job.step_retry_counts,
+        "created_at": _isoformat(job.created_at),
+        "updated_at": _isoformat(job.updated_at),
+    }
+    return zlib.compress(codec.dumpb(record))
+
+
+def load_archived_job(archived: ArchivedJob) -> Dict[str, Any]:
+    """Decompresses an archived job back into its JSON record"""
+    return codec.loads(zlib.decompress(archived.payload))
+
+
+def _archive_batch(session, filters, batch_size: int) -> int:
+    jobs = session.query(Job).filter(*filters).limit(batch_size).all()
+    for job in jobs:
+        finished_at = job.updated_at or job.created_at or clock.now()
+        session.add(
+            ArchivedJob(
+                id=job.id,
+                workflow_name=job.workflow_name,
+                status=job.status,
+                archived_on=finished_at.date().isoformat(),
+                created_at=job.created_at,
+                updated_at=job.updated_at,
+                payload=compress_job(job),
+            )
+        )
+        session.delete(job)
+    # Copy and delete in one transaction so a job is never lost or duplicated
+    session.commit()
+    return len(jobs)
+
+
+def archive_finished_jobs(
+    now: Optional[datetime] = None, batch_size: int = config.ARCHIVE_BATCH_SIZE
+) -> int:
+    """Moves terminal jobs past their workflow's retention into archived_jobs"""
+    now = now or clock.now()
+    overrides = config.WORKFLOW_RETENTION_DAYS
+    finished = func.coalesce(Job.updated_at, Job.created_at)
+
+    groups = [(days, Job.workflow_name == name) for name, days in overrides.items()]
+    groups.append((config.RETENTION_DAYS, Job.workflow_name.notin_(list(overrides))))
+
+    archived = 0
+    session = SessionLocal()
+    try:
+        for days, workflow_filter in groups:
+            filters = [
+                Job.status.in_(TERMINAL_STATUSES),
+                finished < now - timedelta(days=days),
+                workflow_filter,
+            ]
+            while True:
+                count = _archive_batch(session, filters, batch_size)
+                archived += count
+                if count < batch_size:
+                    break
+    finally:
+        session.close()
+    return archived
+
+
+def compact_database(pages: int = config.COMPACTION_PAGES):
+    """Returns up to `pages` free pages to the filesystem.
+
+    Only frees pages once init_db has switched SQLite to incremental
+    auto_vacuum; that conversion rewrites the whole file, so it is not
+    done here.
+    """
+    if engine.dialect.name != "sqlite":
+        return  # Server databases reclaim space through their own autovacuum
+    raw = engine.raw_connection()
+    try:
+        # executescript steps the pragma to completion; execute() frees one page
+        raw.driver_connection.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+    finally:
+        raw.close()
+
+
+async def archive_loop(interval: float = config.ARCHIVE_INTERVAL_SECONDS):
+    while True:
+        try:
+            archived = await asyncio.to_thread(archive_finished_jobs)
+            if archived:
+                logger.info(f"Archived {archived} finished job(s)")
+            await asyncio.to_thread(compact_database)
+        except Exception as e:
+            logger.error(f"Archival failed: {str(e)}", exc_info=True)
+        await clock.sleep(interval)
@@ -0,0 +1,68 @@
+import asyncio
+from contextlib import contextmanager
+from datetime import datetime, timedelta, UTC
+from typing import Iterator, Optional
+
+
+class Clock:
+    """Real time. Core modules read the time through `clock.now()` so that
+    tests and simulations can swap in a VirtualClock."""
+
+    def now(self) -> datetime:
+        return datetime.now(UTC)
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """Time that only moves when advanced, or when something sleeps on it"""
+
+    def __init__(self, start: Optional[datetime] = None):
+        self._now = start or datetime.now(UTC)
+
+    def now(self) -> datetime:
+        return self._now
+
+    def advance(self, seconds: float):
+        self._now += timedelta(seconds=seconds)
+
+    def advance_to(self, moment: datetime):
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=UTC)  # SQLite drops tzinfo
+        self._now = max(self._now, moment)
+
+    async def sleep(self, seconds: float):
+        self.advance(seconds)
+        await asyncio.sleep(0)
+
+
+_clock: Clock = Clock()
+
+
+def now() -> datetime:
+    return _clock.now()
+
+
+async def sleep(seconds: float):
+    await _clock.sleep(seconds)
+
+
+def get_clock() -> Clock:
+    return _clock
+
+
+def set_clock(new_clock: Clock) -> Clock:
+    """Installs a clock process-wide and returns the previous one"""
+    global _clock
+    previous, _clock = _clock, new_clock
+    return previous
+
+
+@contextmanager
+def use_clock(new_clock: Clock) -> Iterator[Clock]:
+    previous = set_clock(new_clock)
+    try:
+        yield new_clock
+    finally:
+        set_clock(previous)
@@ -0,0 +1,65 @@
+import json
+import logging
+from typing import Any, Union
+import config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; the standard library always works
+    orjson = None
+
+
+class _StdlibCodec:
+    name = "json"
+
+    @staticmethod
+    def dumps(obj: Any, sort_keys: bool = False) -> str:
+        return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":"))
+
+    @classmethod
+    def dumpb(cls, obj: Any, sort_keys: bool = False) -> bytes:
+        return cls.dumps(obj, sort_keys).encode("utf-8")
+
+    @staticmethod
+    def loads(data: Union[str, bytes, bytearray]) -> Any:
+        return json.loads(data)
+
+
+class _OrjsonCodec:
+    name = "orjson"
+    # Integer dict keys become strings, as they do with the json module
+    _options = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    @classmethod
+    def dumps(cls, obj: Any, sort_keys: bool = False) -> str:
+        return cls.dumpb(obj, sort_keys).decode("utf-8")
+
+    @classmethod
+    def dumpb(cls, obj: Any, sort_keys: bool = False) -> bytes:
+        options = cls._options | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, option=options)
+
+    @staticmethod
+    def loads(data: Union[str, bytes, bytearray]) -> Any:
+        return orjson.loads(data)
+
+
+def _select(preference: str):
+    if preference == "json":
+        return _StdlibCodec
+    if orjson is None:
+        if preference == "orjson":
+            logger.warning("KARYA_JSON_CODEC=orjson but orjson is not installed")
+        return _StdlibCodec
+    return _OrjsonCodec
+
+
+_codec = _select(config.JSON_CODEC)
+
+# Compact JSON everywhere: DB columns, API responses, HTTP actions, archives
+name: str = _codec.name
+dumps = _codec.dumps
+dumpb = _codec.dumpb
+loads = _codec.loads
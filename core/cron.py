@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import FrozenSet, Optional
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+_MONTHS = ["jan", "feb", "mar", "apr", "may", "jun",
+           "jul", "aug", "sep", "oct", "nov", "dec"]  # fmt: skip
+_DAYS = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]
+
+# (name, low, high, names)
+_FIELDS = [
+    ("minute", 0, 59, None),
+    ("hour", 0, 23, None),
+    ("day of month", 1, 31, None),
+    ("month", 1, 12, _MONTHS),
+    ("day of week", 0, 7, _DAYS),
+]
+
+# Give up on expressions that never match, such as "0 0 30 2 *"
+_SEARCH_YEARS = 8
+
+
+def _value(token: str, name: str, low: int, names) -> int:
+    if names and token.lower() in names:
+        return names.index(token.lower()) + (low if name == "month" else 0)
+    if not token.isdigit():
+        raise ValueError(f"Invalid {name} value '{token}'")
+    return int(token)
+
+
+def _parse_field(source: str, name: str, low: int, high: int, names) -> FrozenSet[int]:
+    values = set()
+    for part in source.split(","):
+        base, _, step = part.partition("/")
+        step = int(step) if step.isdigit() else None
+        if "/" in part and not step:
+            raise ValueError(f"Invalid step in {name} field '{part}'")
+        if base == "*":
+            start, end = low, high
+        elif "-" in base:
+            first, _, last = base.partition("-")
+            start, end = _value(first, name, low, names), _value(last, name, low, names)
+        else:
+            start = _value(base, name, low, names)
+            end = high if step else start
+        if not low <= start <= end <= high:
+            raise ValueError(f"{name.capitalize()} field '{part}' is out of range")
+        values.update(range(start, end + 1, step or 1))
+    return frozenset(values)
+
+
+class CronExpression:
+    """Standard five-field cron expression, evaluated in UTC.
+
+    Supports lists, ranges, steps, month and weekday names and the @daily
+    style macros. As in Vixie cron, when both day fields are restricted a
+    day matches if either one does.
+    """
+
+    def __init__(self, expr: str):
+        self.expr = expr
+        fields = MACROS.get(expr.strip().lower(), expr).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression '{expr}' must have 5 fields")
+        parsed = [_parse_field(source, *spec) for source, spec in zip(fields, _FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = frozenset(d % 7 for d in weekdays)  # 7 is also Sunday
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, t: datetime) -> bool:
+        in_days = t.day in self.days
+        in_weekdays = (t.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def next_after(self, after: datetime) -> datetime:
+        """Returns the first matching minute strictly after `after`.
+
+        Jumps field by field instead of testing every minute, so even
+        sparse expressions take a handful of iterations.
+        """
+        t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = after.year + _SEARCH_YEARS
+        while t.year <= limit:
+            if t.month not in self.months:
+                year, month = (
+                    (t.year + 1, 1) if t.month == 12 else (t.year, t.month + 1)
+                )
+                t = t.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(t):
+                t = (t + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if t.hour not in self.hours:
+                t = (t + timedelta(hours=1)).replace(minute=0)
+                continue
+            minute = _first_at_least(self.minutes, t.minute)
+            if minute is None:
+                t = (t + timedelta(hours=1)).replace(minute=0)
+                continue
+            return t.replace(minute=minute)
+        raise ValueError(f"Cron expression '{self.expr}' never fires")
+
+
+def _first_at_least(values: FrozenSet[int], start: int) -> Optional[int]:
+    candidates = [v for v in values if v >= start]
+    return min(candidates) if candidates else None
+
+
+@lru_cache(maxsize=4096)
+def parse(expr: str) -> CronExpression:
+    """Parses a cron expression, caching the result; raises ValueError"""
+    cron = CronExpression(expr)
+    cron.next_after(datetime(2000, 1, 1))  # reject expressions that never fire
+    return cron
@@ -0,0 +1,195 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+import config
+from core.executor import ACTIVE_JOBS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueueStats:
+    dispatched: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    recent_waits: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+
+    def record_wait(self, seconds: float):
+        self.dispatched += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        self.recent_waits.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        recent = sorted(self.recent_waits)
+        return {
+            "dispatched": self.dispatched,
+            "wait_seconds_avg": (
+                round(self.wait_seconds_total / self.dispatched, 6)
+                if self.dispatched
+                else 0.0
+            ),
+            "wait_seconds_p95": (
+                round(recent[int(0.95 * (len(recent) - 1))], 6) if recent else 0.0
+            ),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+        }
+
+
+@dataclass
+class _Queue:
+    weight: float
+    finish_tag: float = 0.0
+    jobs: List[tuple] = field(default_factory=list)  # heap of (-priority, seq, entry)
+    stats: QueueStats = field(default_factory=QueueStats)
+
+
+@dataclass
+class _Entry:
+    job_id: str
+    queue: str
+    run: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class JobDispatcher:
+    """Starts jobs under a concurrency limit, sharing it fairly across workflows.
+
+    Each workflow_name gets its own queue, ordered by priority and then
+    arrival. Queues are served by weighted fair queuing: every dispatch
+    advances the queue's finish tag by 1/weight and the queue with the
+    lowest tag goes next, so a burst in one workflow cannot starve the
+    others. Weights come from WORKFLOW_WEIGHTS and default to 1.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = config.DISPATCH_CONCURRENCY,
+        weights: Optional[Dict[str, float]] = None,
+    ):
+        self.concurrency = concurrency
+        self.weights = config.WORKFLOW_WEIGHTS if weights is None else weights
+        self.running = 0
+        self._queues: Dict[str, _Queue] = {}
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._idle: Optional[asyncio.Event] = None
+
+    def submit(
+        self,
+        job_id: str,
+        workflow_name: str,
+        run: Callable[[], Awaitable[Any]],
+        priority: int = 0,
+    ) -> asyncio.Future:
+        """Queues a job and returns a future that resolves when it finishes.
+
+        Higher priorities run first within their workflow's queue.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A new event loop (tests, CLI runs) starts from an empty dispatcher
+            self._loop = loop
+            self._queues.clear()
+            self._virtual_time = 0.0
+            self.running = 0
+            self._idle = asyncio.Event()
+        queue = self._queues.get(workflow_name)
+        if queue is None:
+            queue = self._queues[workflow_name] = _Queue(
+                weight=self.weights.get(workflow_name, 1)
+            )
+        if not queue.jobs:
+            # An idle queue rejoins at the current virtual time instead of
+            # cashing in the turns it skipped while it was empty
+            queue.finish_tag = max(queue.finish_tag, self._virtual_time)
+
+        entry = _Entry(
+            job_id, workflow_name, run, loop.create_future(), time.monotonic()
+        )
+        heapq.heappush(queue.jobs, (-priority, next(self._seq), entry))
+        self._idle.clear()
+        # Owned by this process from now on: heartbeated, never "recovered"
+        ACTIVE_JOBS.add(job_id)
+        self._dispatch()
+        return entry.future
+
+    def _next(self) -> Optional[_Entry]:
+        ready = [queue for queue in self._queues.values() if queue.jobs]
+        if not ready:
+            return None
+        queue = min(ready, key=lambda q: q.finish_tag)
+        self._virtual_time = queue.finish_tag
+        queue.finish_tag += 1 / queue.weight
+        return heapq.heappop(queue.jobs)[2]
+
+    def _dispatch(self):
+        while self.running < self.concurrency:
+            entry = self._next()
+            if entry is None:
+                return
+            self.running += 1
+            self._queues[entry.queue].stats.record_wait(
+                time.monotonic() - entry.enqueued_at
+            )
+            self._loop.create_task(self._execute(entry))
+
+    async def _execute(self, entry: _Entry):
+        try:
+            result = await entry.run()
+        except Exception as e:
+            logger.error(f"[Job {entry.job_id}] Dispatch failed: {str(e)}")
+            if not entry.future.done():
+                entry.future.set_exception(e)
+        else:
+            if not entry.future.done():
+                entry.future.set_result(result)
+        finally:
+            ACTIVE_JOBS.discard(entry.job_id)
+            self.running -= 1
+            self._dispatch()
+            if not self.running:
+                self._idle.set()
+
+    async def wait_idle(self):
+        """Waits until no job is queued or running on this event loop"""
+        if self._loop is asyncio.get_running_loop() and self._idle is not None:
+            await self._idle.wait()
+
+    def cancel(self, job_id: str) -> bool:
+        """Drops a job that is still queued; its future resolves to None"""
+        for queue in self._queues.values():
+            for n, (_, _, entry) in enumerate(queue.jobs):
+                if entry.job_id != job_id:
+                    continue
+                queue.jobs.pop(n)
+                heapq.heapify(queue.jobs)
+                ACTIVE_JOBS.discard(job_id)
+                if not entry.future.done():
+                    entry.future.set_result(None)
+                return True
+        return False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "concurrency": self.concurrency,
+            "queues": {
+                name: {
+                    "weight": queue.weight,
+                    "queued": len(queue.jobs),
+                    **queue.stats.snapshot(),
+                }
+                for name, queue in self._queues.items()
+            },
+        }
+
+
+dispatcher = JobDispatcher()
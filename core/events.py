@@ -0,0 +1,70 @@
+import asyncio
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Set
+import config
+from core import clock
+
+logger = logging.getLogger(__name__)
+
+
+class JobEventBus:
+    """In-process fan-out of job status and step events to many subscribers.
+
+    Publishing is a dict lookup when nobody is listening. Each subscriber
+    gets a bounded queue; a subscriber that falls behind loses its oldest
+    events rather than slowing the executor down.
+    """
+
+    def __init__(self, max_queued: int = config.EVENT_QUEUE_SIZE):
+        self.max_queued = max_queued
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def publish(self, job_id: str, event: Dict[str, Any]):
+        for queue in self._subscribers.get(job_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    @contextmanager
+    def subscribe(self, job_id: str) -> Iterator[asyncio.Queue]:
+        queue = asyncio.Queue(self.max_queued)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(job_id, set())
+            subscribers.discard(queue)
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
+
+    def subscriber_count(self, job_id: str) -> int:
+        return len(self._subscribers.get(job_id, ()))
+
+
+def status_event(
+    job_id: str, status: str, step: Optional[str], message: Optional[str] = None
+) -> Dict[str, Any]:
+    event = {
+        "type": "status",
+        "job_id": job_id,
+        "status": status,
+        "step": step,
+        "timestamp": clock.now().isoformat(),
+    }
+    if message:
+        event["message"] = message
+    return event
+
+
+def step_event(job_id: str, step: str, step_type: str) -> Dict[str, Any]:
+    return {
+        "type": "step",
+        "job_id": job_id,
+        "step": step,
+        "step_type": step_type,
+        "timestamp": clock.now().isoformat(),
+    }
+
+
+job_events = JobEventBus()
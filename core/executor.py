@@ -1,16 +1,50 @@
-import json
-import httpx
-import jinja2
+import asyncio
 import logging
-from datetime import datetime, timedelta, UTC
-from typing import Dict, List, Any, Optional
+from datetime import timedelta
+from typing import Dict, List, Any, Optional, Set
+import config
 from db.models import Job, Action
-from db.session import SessionLocal
+from db.session import session_scope
+from core import (
+    clock,
+    codec,
+    expressions,
+    projection,
+    python_actions,
+    signals,
+    workflow,
+)
+from core.events import job_events, status_event, step_event
+from core.writer import STOPPED, state_writer
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(
-    level=logging.INFO, format="[%(asctime)s] %(levelname)s in %(name)s: %(message)s"
-)
+
+# IDs of jobs executing in this process; the resumer heartbeats them
+ACTIVE_JOBS: Set[str] = set()
+
+# Executors whose run() is in progress in this process, so that pause and
+# cancel requests can reach them
+RUNNING_EXECUTORS: Dict[str, "FlowExecutor"] = {}
+
+# httpx transport for HTTP actions; None means the network. Simulations and
+# tests swap in an httpx.MockTransport as the downstream.
+HTTP_TRANSPORT: Optional[Any] = None
+
+
+async def _read_json(stream, max_bytes: int) -> Any:
+    """Streams a response body, giving up as soon as it exceeds max_bytes"""
+    async with stream as resp:
+        declared = resp.headers.get("content-length")
+        if declared and declared.isdigit() and int(declared) > max_bytes:
+            raise ValueError(
+                f"Response of {declared} bytes exceeds the {max_bytes} byte limit"
+            )
+        body = bytearray()
+        async for chunk in resp.aiter_bytes():
+            body += chunk
+            if len(body) > max_bytes:
+                raise ValueError(f"Response exceeds the {max_bytes} byte limit")
+    return codec.loads(body)
 
 
 class FlowExecutor:
@@ -19,93 +53,173 @@ class FlowExecutor:
     ):
 
         self.job_id = job_id
-        self.template_env = jinja2.Environment()
-        self.session = SessionLocal()
         self.default_max_retries = 5
 
-        # Fetch job to get existing retry state if any
-        job = self.session.query(Job).get(job_id)
-
-        # Load existing retry counts from DB (if any)
+        # Load existing retry counts from DB (if any). Sessions are opened per
+        # unit of work so none is held across awaits on slow HTTP calls.
         step_retries = {}
-        if job and job.step_retry_counts:
-            step_retries = job.step_retry_counts.copy()
+        with session_scope() as session:
+            job = session.get(Job, job_id)
+            if job and job.step_retry_counts:
+                step_retries = dict(job.step_retry_counts)
 
         self.steps = steps
         self.context = {
             "context": parameters,
             "meta": {
                 "job_id": job_id,
-                "start_time": datetime.now(UTC).isoformat(),
-                "step_retries": step_retries
+                "start_time": clock.now().isoformat(),
+                "step_retries": step_retries,
             },
         }
 
         self.retry_counts = step_retries.copy()
+        self.start_index: Optional[int] = None
+
+        # Set by request_stop; checked between steps
+        self.stop_status: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._step_index = 0
+        self._interruptible = False
+
+    def restore_checkpoint(self, context: Dict[str, Any], start_index: int):
+        """Restores persisted outputs so execution continues at start_index"""
+        self.context["output"] = dict(context.get("output", {}))
+        self.start_index = start_index
+
+    def request_stop(self, status: str):
+        """Stops the run with status PAUSED or CANCELLED.
+
+        The current step normally finishes first. An in-flight HTTP call is
+        cancelled instead, and its step runs again if the job is resumed.
+        """
+        self.stop_status = status
+        if self._interruptible and self._task is not None:
+            self._task.cancel()
+
+    def _stopped_elsewhere(self, status: str):
+        """Takes over a PAUSING/CANCELLING status a status write ran into"""
+        logger.info(f"[Job {self.job_id}] {status.capitalize()} through the API")
+        self.request_stop(STOPPED[status])
+
+    async def stop(self, index: int, parked: Optional[str] = None) -> str:
+        """Records a stopped run.
+
+        A paused job resumes at step `index`, or goes back to the `parked`
+        status (WAITING or AWAITING_SIGNAL) the step had just put it in.
+        """
+        steps = workflow.get_plan(self.steps).steps
+        step_id = steps[index]["id"] if index < len(steps) else None
+        if self.stop_status == "PAUSED":
+            if parked:
+                self.context["meta"]["paused_from"] = parked
+            else:
+                self.context["meta"]["resume_step"] = step_id
+        await self.update_job_status(
+            self.stop_status, f"{self.stop_status.capitalize()} at step '{step_id}'"
+        )
+        return self.stop_status.lower()
+
+    async def persist_context(self):
+        await state_writer.write(
+            self.job_id,
+            {
+                "context": self.context,
+                "current_step_id": self.context["meta"].get("current_step"),
+                "step_retry_counts": self.context["meta"]["step_retries"].copy(),
+                "updated_at": clock.now(),
+            },
+        )
+        logger.info(
+            f"[Job {self.job_id}] Context persisted after step '{self.context['meta'].get('current_step')}'"
+        )
 
-    def persist_context(self):
-        job = self.session.query(Job).get(self.job_id)
-        if job:
-            job.context = self.context
-            job.current_step_id = self.context["meta"].get("current_step")
-            job.step_retry_counts = self.context["meta"]["step_retries"].copy()
-            self.session.commit()
-            logger.info(
-                f"[Job {self.job_id}] Context persisted after step '{job.current_step_id}'"
-            )
-
-    def update_job_status(self, status: str, error: Optional[str] = None):
-        job = self.session.query(Job).get(self.job_id)
-        if job:
-            job.status = status
-            job.context = self.context
-            job.current_step_id = self.context["meta"].get("current_step")
-            job.updated_at = datetime.now(UTC)
-            if error and hasattr(job, "message"):
-                job.message = error
-            self.session.commit()
-            logger.info(f"[Job {self.job_id}] Status updated to {status}")
+    async def update_job_status(self, status: str, error: Optional[str] = None):
+        values = {
+            "status": status,
+            "context": self.context,
+            "current_step_id": self.context["meta"].get("current_step"),
+            "updated_at": clock.now(),
+        }
+        if error:
+            values["message"] = error
+        held = await state_writer.write(self.job_id, values)
+        if held:
+            self._stopped_elsewhere(held)
+            return
+        job_events.publish(
+            self.job_id,
+            status_event(self.job_id, status, values["current_step_id"], error),
+        )
+        logger.info(f"[Job {self.job_id}] Status updated to {status}")
 
     async def load_action(self, action_name: str) -> Dict[str, Any]:
-        action_obj = (
-            self.session.query(Action).filter(Action.name == action_name).first()
+        with session_scope() as session:
+            action_obj = (
+                session.query(Action).filter(Action.name == action_name).first()
+            )
+            if not action_obj:
+                raise ValueError(f"Action '{action_name}' not found in DB")
+            return {"type": action_obj.type, **action_obj.config}
+
+    def render_json(self, templates: Dict[str, str]) -> Dict[str, Any]:
+        """Renders each template against the context and parses it as JSON"""
+        rendered = {}
+        for key, template_val in templates.items():
+            template_str = expressions.compile_template(template_val)
+            rendered[key] = codec.loads(template_str.render(**self.context))
+        return rendered
+
+    async def execute_python(self, action: Dict[str, Any]) -> str:
+        inputs = action.get("inputs")
+        inputs = self.context if inputs is None else self.render_json(inputs)
+        logger.info(
+            f"[Job {self.job_id}] Running python action function '{action['function']}'"
+        )
+        data = await python_actions.run(
+            action["function"], inputs, action.get("timeout")
         )
-        if not action_obj:
-            raise ValueError(f"Action '{action_name}' not found in DB")
-        return {"type": action_obj.type, **action_obj.config}
+        if "save_as" in action:
+            self.context.setdefault("output", {})[action["save_as"]] = (
+                projection.project(data, action.get("project"))
+            )
+        return "python_completed"
 
     async def execute_http(self, action: Dict[str, Any]) -> str:
-        url = self.template_env.from_string(action["url"]).render(**self.context)
+        url = expressions.compile_template(action["url"]).render(**self.context)
         body_template = action.get("body")
-
-        if body_template is None:
-            body = self.context
-        else:
-            rendered_body = {}
-            for key, template_val in body_template.items():
-                template_str = self.template_env.from_string(template_val)
-                rendered_json = template_str.render(**self.context)
-                rendered_body[key] = json.loads(rendered_json)
-            body = rendered_body
+        body = (
+            self.context if body_template is None else self.render_json(body_template)
+        )
 
         headers = {
-            k: self.template_env.from_string(v).render(**self.context)
+            k: expressions.compile_template(v).render(**self.context)
             for k, v in action.get("headers", {}).items()
         }
 
         logger.info(
             f"[Job {self.job_id}] Executing HTTP {action['method']} request to {url}"
         )
-        async with httpx.AsyncClient() as client:
+        import httpx  # Deferred: a large import that only HTTP actions need
+
+        async with httpx.AsyncClient(transport=HTTP_TRANSPORT) as client:
             logger.info(
                 f"method: {action['method']}, url: {url}, headers: {headers}, body: {body}"
             )
-            resp = await client.request(
-                action["method"], url, headers=headers, json=body
+            data = await _read_json(
+                client.stream(
+                    action["method"],
+                    url,
+                    headers={"Content-Type": "application/json", **headers},
+                    content=codec.dumpb(body),
+                ),
+                int(action.get("max_response_bytes", config.HTTP_MAX_RESPONSE_BYTES)),
             )
-            data = resp.json()
             if "save_as" in action:
-                self.context.setdefault("output", {})[action["save_as"]] = data
+                # Only the projected fields are kept in (and persisted with) the context
+                self.context.setdefault("output", {})[action["save_as"]] = (
+                    projection.project(data, action.get("project"))
+                )
             logger.info(
                 f"[Job {self.job_id}] HTTP response saved to '{action.get('save_as', 'output')}'"
             )
@@ -116,11 +230,7 @@ class FlowExecutor:
             if "if" in cond:
                 expr = cond["if"]
                 try:
-                    template = self.template_env.from_string(
-                        f"{{% if {expr} %}}true{{% else %}}false{{% endif %}}"
-                    )
-                    result = template.render(**self.context)
-                    if result == "true":
+                    if expressions.evaluate_condition(expr, self.context):
                         return cond["next"]
                 except Exception as e:
                     logger.warning(
@@ -131,6 +241,42 @@ class FlowExecutor:
                 return cond["default"]
         raise ValueError("No matching condition and no default found")
 
+    async def wait_for_signal(self, step: Dict[str, Any]) -> Optional[str]:
+        step_id = step["id"]
+        correlation_key = None
+        if step.get("correlation_key"):
+            correlation_key = expressions.compile_template(
+                str(step["correlation_key"])
+            ).render(**self.context)
+
+        resume_at = None
+        if step.get("timeout") is not None:
+            timeout_str = expressions.compile_template(str(step["timeout"])).render(
+                **self.context
+            )
+            try:
+                resume_at = clock.now() + timedelta(seconds=float(timeout_str))
+            except ValueError:
+                raise ValueError(f"Signal timeout not a number for step '{step_id}'")
+
+        status = signals.park_job(
+            self.job_id, self.context, step, correlation_key, resume_at
+        )
+        if status in STOPPED:
+            self._stopped_elsewhere(status)
+            return "awaiting_signal"
+        if status:
+            job_events.publish(
+                self.job_id,
+                status_event(self.job_id, signals.AWAITING_SIGNAL, step_id),
+            )
+            logger.info(
+                f"[Job {self.job_id}] Waiting for signal"
+                f"{f' {correlation_key!r}' if correlation_key else ''} at step '{step_id}'"
+            )
+            return "awaiting_signal"  # Halt here; a signal or the timeout resumes it
+        return "signal_received"
+
     async def run_step(self, step: Dict[str, Any]) -> Optional[str]:
         step_type = step["type"]
         step_id = step["id"]
@@ -139,15 +285,25 @@ class FlowExecutor:
         )
 
         self.context["meta"]["current_step"] = step_id
-        self.context["meta"]["current_time"] = datetime.now(UTC).isoformat()
+        self.context["meta"]["current_time"] = clock.now().isoformat()
+        job_events.publish(self.job_id, step_event(self.job_id, step_id, step_type))
 
         try:
             if step_type == "task":
                 result = None
                 action = await self.load_action(step["action"])
                 if action["type"] == "http":
-                    result = await self.execute_http(action)
-                self.persist_context()
+                    # Pause/cancel abandon a slow call instead of waiting it out
+                    self._interruptible = True
+                    try:
+                        result = await self.execute_http(action)
+                    finally:
+                        self._interruptible = False
+                elif action["type"] == "python":
+                    result = await self.execute_python(action)
+                else:
+                    raise ValueError(f"Unsupported action type '{action['type']}'")
+                await self.persist_context()
                 return result
 
             elif step_type == "wait":
@@ -158,16 +314,16 @@ class FlowExecutor:
                 ]
 
                 if self.retry_counts[step_id] > max_retries:
-                    self.update_job_status(
+                    await self.update_job_status(
                         "FAILED", f"Max retries exceeded for step '{step_id}'"
                     )
                     return None
 
-                duration_str = self.template_env.from_string(
+                duration_str = expressions.compile_template(
                     str(step["duration"])
                 ).render(**self.context)
                 if not duration_str.strip():
-                    self.update_job_status(
+                    await self.update_job_status(
                         "FAILED", f"Invalid wait duration for step '{step_id}'"
                     )
                     return None
@@ -175,31 +331,40 @@ class FlowExecutor:
                 try:
                     resume_after_seconds = float(duration_str)
                 except ValueError:
-                    self.update_job_status(
+                    await self.update_job_status(
                         "FAILED", f"Wait duration not a number for step '{step_id}'"
                     )
                     return None
 
-                resume_at = datetime.now(UTC) + timedelta(seconds=resume_after_seconds)
-                job = self.session.query(Job).get(self.job_id)
-                if job:
-                    job.resume_at = resume_at
-                    job.status = "WAITING"
-                    job.context = self.context
-                    job.current_step_id = step_id
-                    job.step_retry_counts = self.context["meta"]["step_retries"].copy()
-                    job.updated_at = datetime.now(UTC)
-                    self.session.commit()
-                    logger.info(
-                        f"[Job {self.job_id}] Paused. Will resume at {resume_at.isoformat()}"
-                    )
+                resume_at = clock.now() + timedelta(seconds=resume_after_seconds)
+                held = await state_writer.write(
+                    self.job_id,
+                    {
+                        "resume_at": resume_at,
+                        "status": "WAITING",
+                        "context": self.context,
+                        "current_step_id": step_id,
+                        "step_retry_counts": self.context["meta"][
+                            "step_retries"
+                        ].copy(),
+                        "updated_at": clock.now(),
+                    },
+                )
+                if held:
+                    self._stopped_elsewhere(held)
+                logger.info(
+                    f"[Job {self.job_id}] Paused. Will resume at {resume_at.isoformat()}"
+                )
                 return "job_paused"  # Halt execution here; poller will resume it later
 
             elif step_type == "choice":
                 next_id = self.evaluate_choice(step)
-                self.persist_context()
+                await self.persist_context()
                 return next_id
 
+            elif step_type == "wait_for_signal":
+                return await self.wait_for_signal(step)
+
             else:
                 raise ValueError(f"Unsupported step type: {step_type}")
 
@@ -211,36 +376,56 @@ class FlowExecutor:
             raise
 
     async def execute_steps(self) -> str:
-        index_map = {step["id"]: i for i, step in enumerate(self.steps)}
+        plan = workflow.get_plan(self.steps)
         last_step_id = self.context["meta"].get("current_step")
-        i = index_map.get(last_step_id, 0)
-        logger.info(
-            f"[Job {self.job_id}] {'Resuming' if last_step_id else 'Starting'} from step '{self.steps[i]['id']}'"
-        )
+        if self.start_index is not None:
+            i = self.start_index
+        else:
+            i = plan.index.get(last_step_id, 0)
+        if i < len(plan.steps):
+            logger.info(
+                f"[Job {self.job_id}] {'Resuming' if i else 'Starting'} from step '{plan.steps[i]['id']}'"
+            )
 
-        while i < len(self.steps):
-            step = self.steps[i]
+        while i < len(plan.steps):
+            if self.stop_status:
+                return await self.stop(i)
+            step = plan.steps[i]
+            self._step_index = i
             result = await self.run_step(step)
+            if self.stop_status and result in ("job_paused", "awaiting_signal"):
+                parked = (
+                    "WAITING" if result == "job_paused" else signals.AWAITING_SIGNAL
+                )
+                return await self.stop(i, parked)
             if result == "job_paused":
-                self.update_job_status("WAITING", f"Paused at step '{step['id']}'")
+                await self.update_job_status(
+                    "WAITING", f"Paused at step '{step['id']}'"
+                )
                 return "paused"
+            if result == "awaiting_signal":
+                return "paused"
+            i = plan.next_index(i, result)
 
-            if step["type"] == "choice":
-                if result not in index_map:
-                    self.update_job_status("FAILED", f"Invalid next step ID: {result}")
-                    return "failed"
-                i = index_map[result]
-            else:
-                i += 1
-
-        self.update_job_status("COMPLETED")
+        await self.update_job_status("COMPLETED")
         return "completed"
 
     async def run(self):
+        ACTIVE_JOBS.add(self.job_id)
+        RUNNING_EXECUTORS[self.job_id] = self
+        self._task = asyncio.current_task()
         try:
             logger.info(f"[Job {self.job_id}] Starting job execution")
-            self.update_job_status("RUNNING")
+            await self.update_job_status("RUNNING")
             await self.execute_steps()
+        except asyncio.CancelledError:
+            if self.stop_status is None:
+                raise  # Shutdown, not a stop request
+            self._task.uncancel()
+            await self.stop(self._step_index)
         except Exception as e:
             logger.error(f"[Job {self.job_id}] Job failed: {str(e)}", exc_info=True)
-            self.update_job_status("FAILED", str(e))
+            await self.update_job_status("FAILED", str(e))
+        finally:
+            RUNNING_EXECUTORS.pop(self.job_id, None)
+            ACTIVE_JOBS.discard(self.job_id)
@@ -0,0 +1,44 @@
+import functools
+from typing import Any, Callable, Dict, List
+
+from jinja2 import Template, TemplateSyntaxError
+from jinja2.sandbox import SandboxedEnvironment
+
+# Conditions and templates come from user-submitted workflows and actions,
+# so they are evaluated in a sandbox
+_env = SandboxedEnvironment()
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_template(source: str) -> Template:
+    """Parses a template once and caches it by its source string"""
+    return _env.from_string(source)
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_condition(expr: str) -> Callable[..., Any]:
+    """Compiles a choice condition once and caches the resulting callable"""
+    return _env.compile_expression(expr)
+
+
+def evaluate_condition(expr: str, context: Dict[str, Any]) -> bool:
+    """Evaluates a compiled condition against the execution context"""
+    return bool(compile_condition(expr)(**context))
+
+
+def validate_conditions(steps: List[Dict[str, Any]]) -> List[str]:
+    """Returns parse errors for every choice condition in the given steps"""
+    errors = []
+    for step in steps:
+        if step.get("type") != "choice":
+            continue
+        for cond in step.get("conditions", []):
+            if "if" not in cond:
+                continue
+            try:
+                compile_condition(cond["if"])
+            except TemplateSyntaxError as e:
+                errors.append(
+                    f"Step '{step.get('id')}': invalid condition '{cond['if']}': {e}"
+                )
+    return errors
@@ -0,0 +1,152 @@
+import logging
+from typing import Optional
+from sqlalchemy import null, update
+from sqlalchemy.orm import Session
+from core import clock, job_utils, workflow
+from core.dispatcher import dispatcher
+from core.events import job_events, status_event
+from core.executor import RUNNING_EXECUTORS, FlowExecutor
+from core.signals import AWAITING_SIGNAL, save_signal
+from core.writer import CANCELLING, PAUSING, STOPPED
+from db.models import Job
+from db.session import session_scope
+
+logger = logging.getLogger(__name__)
+
+PAUSED = "PAUSED"
+CANCELLED = "CANCELLED"
+STOP_STATUSES = (PAUSED, CANCELLED)
+# Status a running job shows until its owner checkpoints (see core.writer)
+STOPPING = {PAUSED: PAUSING, CANCELLED: CANCELLING}
+STOPPABLE_STATUSES = ("SCHEDULED", "RUNNING", "WAITING", AWAITING_SIGNAL)
+PARKED_STATUSES = ("WAITING", AWAITING_SIGNAL)
+
+
+def stop_local(job_id: str, status: str) -> bool:
+    """Stops a job owned by this process with status PAUSED or CANCELLED.
+
+    A running executor is asked to stop and writes its own checkpoint; a
+    job still queued in the dispatcher is dropped so its slot is free at
+    once, and a PAUSING/CANCELLING row for it is settled here. Returns
+    False if this process does not own the job.
+    """
+    executor = RUNNING_EXECUTORS.get(job_id)
+    if executor is not None:
+        executor.request_stop(status)
+        return True
+    if not dispatcher.cancel(job_id):
+        return False
+    with session_scope() as session:
+        settle_stop(session, job_id)
+    return True
+
+
+def _stop_row(session: Session, job: Job, status: str) -> bool:
+    """Moves a job nothing is executing to PAUSED or CANCELLED, recording
+    where a paused job continues. Conditional on the status it was read in."""
+    context = job_utils.get_checkpoint(job)
+    meta = context["meta"]
+    if status == PAUSED:
+        if job.status in PARKED_STATUSES:
+            # Resuming puts it back to sleep with its resume_at untouched
+            meta["paused_from"] = job.status
+        else:
+            index = job_utils.get_resume_index(job)
+            meta["resume_step"] = (
+                job.steps[index]["id"] if index < len(job.steps) else None
+            )
+    message = f"{status.capitalize()} by request"
+    stopped = session.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.status == job.status)
+        .values(status=status, context=context, message=message, updated_at=clock.now())
+    ).rowcount
+    if stopped:
+        job_events.publish(
+            job.id, status_event(job.id, status, job.current_step_id, message)
+        )
+    return bool(stopped)
+
+
+def settle_stop(session: Session, job_id: str) -> bool:
+    """Completes a PAUSING/CANCELLING job whose executor is gone or never
+    started. Returns False when the job is not being stopped."""
+    job = session.get(Job, job_id)
+    if job is None or job.status not in STOPPED:
+        return False
+    return _stop_row(session, job, STOPPED[job.status])
+
+
+def stop_job(session: Session, job_id: str, status: str) -> Optional[str]:
+    """Pauses or cancels a job.
+
+    Returns "stopped" when nothing was executing the job and its row was
+    updated here, and "stopping" when it is executing, in this process or
+    another: the row shows PAUSING/CANCELLING until the owner checkpoints
+    and records `status` itself (another process finds out on its next
+    heartbeat). None when the job does not exist or has already finished or
+    stopped.
+    """
+    job = session.get(Job, job_id)
+    if job is None or job.status not in STOPPABLE_STATUSES:
+        return None
+    if job.status in PARKED_STATUSES or dispatcher.cancel(job_id):
+        stopped = _stop_row(session, job, status)
+        session.commit()
+        if stopped:
+            logger.info(f"[Job {job_id}] {status.capitalize()} by request")
+        return "stopped" if stopped else None
+
+    stopping = session.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == job.status)
+        .values(status=STOPPING[status], updated_at=clock.now())
+    ).rowcount
+    session.commit()
+    if not stopping:
+        return None
+    job_events.publish(
+        job_id, status_event(job_id, STOPPING[status], job.current_step_id)
+    )
+    stop_local(job_id, status)
+    logger.info(f"[Job {job_id}] {STOPPING[status].capitalize()} by request")
+    return "stopping"
+
+
+def resume_paused_job(session: Session, job_id: str) -> Optional[str]:
+    """Resumes a PAUSED job.
+
+    Returns the job's new status: the WAITING or AWAITING_SIGNAL it was
+    paused in, or RUNNING once it is resubmitted from its checkpoint. None
+    when the job is missing or not paused, including while still PAUSING.
+    """
+    job = session.get(Job, job_id)
+    if job is None or job.status != PAUSED:
+        return None
+    context = job_utils.get_checkpoint(job)
+    meta = context["meta"]
+    status = meta.pop("paused_from", None) or "RUNNING"
+    start_index = job_utils.get_resume_index(job)
+    meta.pop("resume_step", None)
+    values = {"status": status, "context": context, "message": None}
+    if status == AWAITING_SIGNAL and job.signal_payload is not None:
+        # A signal was buffered while it was paused on its signal step
+        plan = workflow.get_plan(job.steps)
+        save_signal(context, plan.step(job.current_step_id), job.signal_payload)
+        start_index = plan.next_index(plan.index[job.current_step_id], None)
+        status = values["status"] = "RUNNING"
+        values.update(signal_payload=null(), correlation_key=None)
+    resumed = session.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == PAUSED)
+        .values(**values, updated_at=clock.now())
+    ).rowcount
+    session.commit()
+    if not resumed:
+        return None
+    if status == "RUNNING":
+        executor = FlowExecutor(job.steps, context["context"], job_id)
+        executor.restore_checkpoint(context, start_index)
+        dispatcher.submit(job_id, job.workflow_name, executor.run, job.priority or 0)
+    logger.info(f"[Job {job_id}] Resumed ({status})")
+    return status
@@ -1,50 +1,282 @@
-from datetime import datetime, UTC
+from contextlib import asynccontextmanager, suppress
+from datetime import timedelta
 import asyncio
 import logging
-from db.session import SessionLocal
+from sqlalchemy import func, update
+import config
+from db.session import SessionLocal, session_scope
 from db.models import Job
-from core.executor import FlowExecutor
-from core import job_utils
+from core.executor import ACTIVE_JOBS, FlowExecutor
+from core import clock, job_control, job_utils, signals, workflow
+from core.dispatcher import dispatcher
+from core.events import job_events, status_event
+from core.writer import STOPPED
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-async def resume_due_jobs():
+async def resume_due_jobs() -> int:
+    """Claims due WAITING/AWAITING_SIGNAL jobs and hands them to the
+    dispatcher. Returns how many were claimed without waiting for them to
+    finish; the dispatcher and heartbeat track them from there."""
     session = SessionLocal()
-    now = datetime.now(UTC)
+    try:
+        now = clock.now()
 
-    due_jobs = (
-        session.query(Job).filter(Job.status == "WAITING", Job.resume_at <= now).all()
-    )
+        # SKIP LOCKED lets several resumers share the backlog on PostgreSQL;
+        # SQLite ignores the clause since it has a single writer anyway
+        due_jobs = (
+            session.query(Job)
+            .filter(
+                Job.status.in_(("WAITING", signals.AWAITING_SIGNAL)),
+                Job.resume_at <= now,
+            )
+            .order_by(Job.priority.desc(), Job.resume_at)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+        claimed, failed = [], []
+        for job in due_jobs:
+            logger.info(f"[Job {job.id}] Attempting to resume job...")
+            job_id, status = job.id, job.status
+
+            start_index = None
+            values = {"status": "RUNNING", "updated_at": clock.now()}
+            if status == signals.AWAITING_SIGNAL:
+                step = job_utils.get_current_step(job)
+                if "on_timeout" in step:
+                    # Continue at the timeout branch with the outputs gathered so far
+                    values["correlation_key"] = None
+                    start_index = workflow.get_plan(job.steps).index[step["on_timeout"]]
+                else:
+                    values["status"] = "FAILED"
+                    values["message"] = (
+                        f"Timed out waiting for signal at step '{step.get('id')}'"
+                    )
 
-    for job in due_jobs:
-        logger.info(f"[Job {job.id}] Attempting to resume job...")
+            elif job_utils.exceeded_max_retries(job):
+                values["status"] = "FAILED"
+                values["message"] = (
+                    f"Max retries exceeded for step '{job.context['meta']['current_step']}'"
+                )
 
-        if job_utils.exceeded_max_retries(job):
-            job.status = "FAILED"
-            job.message = (
-                f"Max retries exceeded for step '{job.context['meta']['current_step']}'"
+            # Conditional on the status we read: a signal delivered (or another
+            # resumer claiming the job) since the SELECT wins, and we skip it.
+            # FOR UPDATE already guarantees this on PostgreSQL, not on SQLite.
+            won = session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == status, Job.resume_at <= now)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not won:
+                logger.info(f"[Job {job_id}] Claimed elsewhere since it was read")
+                continue
+            if values["status"] == "FAILED":
+                logger.warning(f"[Job {job_id}] Failed — {values['message']}")
+                failed.append((job_id, job.current_step_id, values["message"]))
+                continue
+
+            claimed.append(
+                (
+                    job_id,
+                    job.workflow_name,
+                    job.priority or 0,
+                    job.steps,
+                    job_utils.get_parameters(job),
+                    job.context,
+                    job_utils.get_retry_count(job),
+                    start_index,
+                )
             )
-            session.commit()
-            logger.warning(f"[Job {job.id}] Failed — max retries exceeded.")
-            continue
+        session.commit()  # claim every due job in one transaction
+    finally:
+        session.close()  # don't hold a connection while the jobs run
+    for job_id, step_id, message in failed:
+        job_events.publish(job_id, status_event(job_id, "FAILED", step_id, message))
+
+    for (
+        job_id,
+        workflow_name,
+        priority,
+        steps,
+        parameters,
+        context,
+        retry_count,
+        start_index,
+    ) in claimed:
+        logger.info(f"[Job {job_id}] Resuming (retry #{retry_count})...")
+
+        executor = FlowExecutor(steps=steps, parameters=parameters, job_id=job_id)
+        if start_index is not None:
+            executor.restore_checkpoint(context, start_index)
+        dispatcher.submit(job_id, workflow_name, executor.run, priority)
+    return len(claimed)
 
-        job.status = "RUNNING"
-        job.updated_at = datetime.now(UTC)
-        session.commit()  # commit after mutation
 
-        logger.info(
-            f"[Job {job.id}] Resuming (retry #{job_utils.get_retry_count(job)})..."
+def heartbeat_active_jobs():
+    """Refreshes updated_at for every job executing in this process.
+
+    Also stops the ones paused, cancelled or deleted through another process.
+    """
+    if not ACTIVE_JOBS:
+        return
+    job_ids = list(ACTIVE_JOBS)
+    with session_scope() as session:
+        session.query(Job).filter(
+            # Jobs still queued in the dispatcher are SCHEDULED but owned here,
+            # and PAUSING/CANCELLING ones until their executor checkpoints
+            Job.id.in_(job_ids),
+            Job.status.in_(("RUNNING", "SCHEDULED", *STOPPED)),
+        ).update({Job.updated_at: clock.now()}, synchronize_session=False)
+        statuses = dict(
+            session.query(Job.id, Job.status).filter(Job.id.in_(job_ids)).all()
         )
+    for job_id in job_ids:
+        status = statuses.get(job_id, job_control.CANCELLED)
+        status = STOPPED.get(status, status)
+        if status in job_control.STOP_STATUSES and job_control.stop_local(
+            job_id, status
+        ):
+            logger.info(f"[Job {job_id}] Stopping: {status} elsewhere")
+
+
+async def recover_orphaned_jobs(
+    stale_after: float = config.RECOVERY_STALE_SECONDS,
+) -> int:
+    """Resumes RUNNING/SCHEDULED jobs whose owner stopped heartbeating, and
+    completes PAUSING/CANCELLING ones it would never checkpoint.
+
+    Like resume_due_jobs, returns the number claimed once they are queued.
+    """
+    session = SessionLocal()
+    try:
+        cutoff = clock.now() - timedelta(seconds=stale_after)
+        last_seen = func.coalesce(Job.updated_at, Job.created_at)
+
+        stopping = [
+            job_id
+            for (job_id,) in session.query(Job.id).filter(
+                Job.status.in_(STOPPED), last_seen < cutoff
+            )
+            if job_id not in ACTIVE_JOBS
+        ]
+        for job_id in stopping:
+            if job_control.settle_stop(session, job_id):
+                logger.info(f"[Job {job_id}] Stopped for an owner that went away")
+        session.commit()
 
-        executor = FlowExecutor(
-            steps=job.steps, parameters=job.context.get("context", {}), job_id=job.id
+        orphans = (
+            session.query(Job)
+            .filter(Job.status.in_(("RUNNING", "SCHEDULED")), last_seen < cutoff)
+            .all()
         )
-        await executor.run()
 
-    session.close()
+        claimed = []
+        for job in orphans:
+            if job.id in ACTIVE_JOBS:
+                continue
+            job_id, status = job.id, job.status
+            workflow_name, priority = job.workflow_name, job.priority or 0
+            steps, context = job.steps, dict(job.context or {})
+            parameters = job_utils.get_parameters(job)
+            start_index = job_utils.get_resume_index(job)
+
+            # Conditional update so that concurrent sweepers never claim the same job
+            won = (
+                session.query(Job)
+                .filter(Job.id == job_id, Job.status == status, last_seen < cutoff)
+                .update(
+                    {Job.status: "RUNNING", Job.updated_at: clock.now()},
+                    synchronize_session=False,
+                )
+            )
+            session.commit()
+            if won:
+                ACTIVE_JOBS.add(job_id)
+                claimed.append(
+                    (
+                        job_id,
+                        workflow_name,
+                        priority,
+                        steps,
+                        parameters,
+                        context,
+                        start_index,
+                    )
+                )
+                logger.info(f"[Job {job_id}] Recovering orphaned {status} job...")
+    finally:
+        session.close()
+
+    # Recovered jobs share DISPATCH_CONCURRENCY and fair queuing with new work
+    for (
+        job_id,
+        workflow_name,
+        priority,
+        steps,
+        parameters,
+        context,
+        start_index,
+    ) in claimed:
+        executor = FlowExecutor(steps=steps, parameters=parameters, job_id=job_id)
+        executor.restore_checkpoint(context, start_index)
+        dispatcher.submit(job_id, workflow_name, executor.run, priority)
+    return len(claimed)
+
+
+async def heartbeat_loop(interval: float = config.HEARTBEAT_INTERVAL_SECONDS):
+    while True:
+        try:
+            heartbeat_active_jobs()
+        except Exception as e:
+            logger.error(f"Heartbeat failed: {str(e)}")
+        # Real time, even under a virtual clock: other processes judge
+        # liveness by their own clocks
+        await asyncio.sleep(interval)
+
+
+@asynccontextmanager
+async def heartbeating(interval: float = config.HEARTBEAT_INTERVAL_SECONDS):
+    """Heartbeats this process's jobs in the background while the block runs,
+    so that no recovery sweep takes them over as orphans"""
+    task = asyncio.create_task(heartbeat_loop(interval))
+    try:
+        yield
+    finally:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+
+async def recovery_loop(interval: float = config.RECOVERY_INTERVAL_SECONDS):
+    while True:
+        try:
+            recovered = await recover_orphaned_jobs()
+            if recovered:
+                logger.info(f"Recovered {recovered} orphaned job(s)")
+        except Exception as e:
+            logger.error(f"Recovery sweep failed: {str(e)}", exc_info=True)
+        await clock.sleep(interval)
+
+
+async def resume_loop(interval: float = config.RESUME_INTERVAL_SECONDS):
+    while True:
+        try:
+            await resume_due_jobs()
+        except Exception as e:
+            logger.error(f"Resume sweep failed: {str(e)}", exc_info=True)
+        await clock.sleep(interval)
+
+
+async def main():
+    async with heartbeating():
+        await recover_orphaned_jobs()
+        await resume_due_jobs()
+        await dispatcher.wait_idle()  # A one-shot run exits once its jobs are done
 
 
 if __name__ == "__main__":
-    asyncio.run(resume_due_jobs())
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
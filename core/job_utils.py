@@ -1,14 +1,73 @@
+import copy
 from db.models import Job
+from core import workflow
 from typing import Dict, Any
 
 
 def get_current_step(job: Job) -> Dict[str, Any]:
     """Returns the current step definition based on job.context.meta.current_step"""
     current_step_id = (job.context or {}).get("meta", {}).get("current_step")
-    for step in job.steps or []:
-        if step["id"] == current_step_id:
-            return step
-    return {}
+    try:
+        plan = workflow.get_plan(job.steps or [])
+    except workflow.WorkflowError:
+        # Jobs stored before validation existed may not compile; fall back to a scan
+        for step in job.steps or []:
+            if step.get("id") == current_step_id:
+                return step
+        return {}
+    step = plan.step(current_step_id)
+    return dict(step) if step is not None else {}
+
+
+def _is_checkpoint(context: Dict[str, Any]) -> bool:
+    return isinstance(context.get("meta"), dict) and "context" in context
+
+
+def get_parameters(job: Job) -> Dict[str, Any]:
+    """Returns the parameters a job was started with.
+
+    A job that never ran still stores the raw request parameters as its
+    context; once the executor has written it, they sit under "context"
+    next to "meta" and "output".
+    """
+    context = job.context or {}
+    if _is_checkpoint(context):
+        return dict(context["context"] or {})
+    return dict(context)
+
+
+def get_checkpoint(job: Job) -> Dict[str, Any]:
+    """Returns a copy of the job's context in the executor's shape, wrapping
+    the raw parameters of a job that never ran"""
+    context = copy.deepcopy(dict(job.context or {}))
+    if _is_checkpoint(context):
+        return context
+    return {"context": context, "meta": {}}
+
+
+def get_resume_index(job: Job) -> int:
+    """Returns the index of the step an interrupted job should continue from"""
+    try:
+        plan = workflow.get_plan(job.steps or [])
+    except workflow.WorkflowError:
+        return 0
+    if job.status == "PAUSED":
+        # Paused jobs record the step they stopped in front of
+        resume_step = (job.context or {}).get("meta", {}).get("resume_step")
+        return plan.index.get(resume_step, 0)
+    i = plan.index.get(job.current_step_id)
+    if i is None or job.status == "SCHEDULED":
+        return 0
+    step_type = plan.steps[i]["type"]
+    if step_type in ("task", "wait_for_signal"):
+        # Task checkpoints are written after the task finished, and a running
+        # job sitting on a signal step has already received its signal
+        return plan.next_index(i, None)
+    if step_type == "wait":
+        # Woken wait steps restart from the top, like resume_due_jobs does
+        return 0
+    # Choices are re-evaluated against the restored context
+    return i
 
 
 def get_retry_count(job: Job) -> int:
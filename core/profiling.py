@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+from collections import Counter, deque
+from types import CodeType, FrameType
+from typing import Any, Deque, Dict, FrozenSet, List, Optional
+import config
+
+logger = logging.getLogger(__name__)
+
+# Both tools watch the event loop from a separate thread through
+# sys._current_frames(), so nothing is added to the code being observed and
+# there is no cost at all while they are off.
+
+
+def _frame_name(frame: FrameType) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{frame.f_code.co_qualname}"
+
+
+def _stack(frame: Optional[FrameType]) -> List[FrameType]:
+    """Frames from the outermost call down to `frame`"""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+class LoopLagMonitor:
+    """Records event-loop stalls longer than a threshold.
+
+    A coroutine stamps a heartbeat every half threshold. A watchdog thread
+    that finds the heartbeat overdue captures the loop thread's stack, which
+    is the code that is blocking it. Once the loop gets the heartbeat
+    going again, the stall's full duration is filled in.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = config.LOOP_LAG_THRESHOLD_MS,
+        history: int = config.LOOP_LAG_HISTORY,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.stalls: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self.stalls_total = 0
+        self.max_lag_ms = 0.0
+        self.running = False
+        self._beat = 0.0
+        self._open_stall: Optional[Dict[str, Any]] = None
+        self._thread_id: Optional[int] = None
+
+    async def run(self):
+        # Real time on purpose: this measures the loop, not the job clock
+        self._thread_id = threading.get_ident()
+        interval = self.threshold / 2
+        stop = threading.Event()
+        watchdog = threading.Thread(
+            target=self._watch, args=(stop,), name="loop-lag-watchdog", daemon=True
+        )
+        self._beat = time.monotonic()
+        self.running = True
+        watchdog.start()
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                now = time.monotonic()
+                lag = now - self._beat - interval
+                self._beat = now
+                self.max_lag_ms = max(self.max_lag_ms, round(lag * 1000, 1))
+                stall, self._open_stall = self._open_stall, None
+                if stall is not None:
+                    stall["lag_ms"] = round(lag * 1000, 1)
+                    culprit = stall["stack"][-1] if stall["stack"] else "?"
+                    logger.warning(
+                        f"Event loop blocked for {stall['lag_ms']}ms in {culprit}"
+                    )
+        finally:
+            self.running = False
+            stop.set()
+
+    def _watch(self, stop: threading.Event):
+        while not stop.wait(self.threshold / 2):
+            beat = self._beat
+            overdue = time.monotonic() - beat - self.threshold / 2
+            if overdue < self.threshold or self._open_stall is not None:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            stall = {
+                "detected_at": time.time(),
+                "lag_ms": None,  # Filled in once the loop runs again
+                "stack": [
+                    f"{_frame_name(f)} ({f.f_code.co_filename}:{f.f_lineno})"
+                    for f in _stack(frame)
+                ],
+            }
+            self.stalls.append(stall)
+            self.stalls_total += 1
+            self._open_stall = stall
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.running,
+            "threshold_ms": self.threshold * 1000,
+            "max_lag_ms": self.max_lag_ms,
+            "stalls_total": self.stalls_total,
+            "recent_stalls": list(self.stalls),
+        }
+
+
+class StackSampler:
+    """Samples one thread's stack, keeping only samples taken inside one of
+    `targets` (code objects), rooted at the outermost of them.
+
+    `collapsed()` returns the counts in the folded format read by
+    flamegraph.pl, speedscope and most flame graph viewers.
+    """
+
+    def __init__(
+        self,
+        targets: FrozenSet[CodeType],
+        interval_ms: float = config.PROFILE_SAMPLE_INTERVAL_MS,
+    ):
+        self.targets = targets
+        self.interval = interval_ms / 1000
+        self.counts: Counter = Counter()
+        self.samples_total = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, thread_id: int):
+        self._thread = threading.Thread(
+            target=self._sample, args=(thread_id,), name="stack-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _sample(self, thread_id: int):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            self.samples_total += 1
+            frames = _stack(frame)
+            for i, f in enumerate(frames):
+                if f.f_code in self.targets:
+                    stack = ";".join(_frame_name(inner) for inner in frames[i:])
+                    self.counts[stack] += 1
+                    break
+
+    def collapsed(self) -> str:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in sorted(self.counts.items())
+        )
+
+
+def default_targets() -> FrozenSet[CodeType]:
+    from core.executor import FlowExecutor
+    from core.job_resumer import recover_orphaned_jobs, resume_due_jobs
+
+    return frozenset(
+        fn.__code__
+        for fn in (FlowExecutor.run_step, resume_due_jobs, recover_orphaned_jobs)
+    )
+
+
+_profiling = False
+
+
+async def profile(
+    seconds: float, targets: Optional[FrozenSet[CodeType]] = None
+) -> StackSampler:
+    """Samples this event loop for `seconds` and returns the sampler.
+
+    By default only time spent in step execution and resumer sweeps is kept.
+    One profile runs at a time; RuntimeError if another is in progress.
+    """
+    global _profiling
+    if _profiling:
+        raise RuntimeError("A profile is already running")
+    _profiling = True
+    sampler = StackSampler(default_targets() if targets is None else targets)
+    sampler.start(threading.get_ident())
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        await asyncio.to_thread(sampler.stop)
+        _profiling = False
+    return sampler
+
+
+loop_lag_monitor = LoopLagMonitor()
@@ -0,0 +1,124 @@
+import re
+from functools import lru_cache
+from typing import Any, List, Tuple, Union
+
+# A path is "$.items[*].id" style (JSONPath subset) or a dotted field path
+# such as "fields.assignee.name". Segments are keys, indexes or "*".
+_TOKEN = re.compile(
+    r"""\.?(?P<key>[A-Za-z_][\w-]*)
+      | \.(?P<star>\*)
+      | \[(?P<index>-?\d+)\]
+      | \[\*\]
+      | \[(?P<quote>['"])(?P<quoted>.*?)(?P=quote)\]
+    """,
+    re.VERBOSE,
+)
+
+WILDCARD = "*"
+_MISSING = object()
+
+Segment = Union[str, int]
+
+
+@lru_cache(maxsize=1024)
+def compile_path(path: str) -> Tuple[Segment, ...]:
+    """Splits a path into segments; raises ValueError if it does not parse"""
+    rooted = path.startswith("$")
+    source = path[1:] if rooted else path
+    segments: List[Segment] = []
+    position = 0
+    while position < len(source):
+        match = _TOKEN.match(source, position)
+        # Only a bare field path may start without a "." or "["
+        bare = match and match.group(0)[0] not in ".["
+        if not match or (bare and (rooted or position > 0)):
+            raise ValueError(f"Invalid projection path '{path}' at {position}")
+        if match.group("key") is not None:
+            segments.append(match.group("key"))
+        elif match.group("quoted") is not None:
+            segments.append(match.group("quoted"))
+        elif match.group("index") is not None:
+            segments.append(int(match.group("index")))
+        else:
+            segments.append(WILDCARD)
+        position = match.end()
+    return tuple(segments)
+
+
+def _find(data: Any, segments: Tuple[Segment, ...]) -> List[Any]:
+    if not segments:
+        return [data]
+    head, rest = segments[0], segments[1:]
+    if head == WILDCARD:
+        if not isinstance(data, (dict, list)):
+            return []
+        children = data.values() if isinstance(data, dict) else data
+        return [match for child in children for match in _find(child, rest)]
+    if isinstance(head, int):
+        if isinstance(data, list) and -len(data) <= head < len(data):
+            return _find(data[head], rest)
+        return []
+    if isinstance(data, dict) and head in data:
+        return _find(data[head], rest)
+    return []
+
+
+def _shape(data: Any, segments: Tuple[Segment, ...]) -> Any:
+    """Keeps only `segments` of data, preserving the surrounding structure"""
+    if not segments:
+        return data
+    head, rest = segments[0], segments[1:]
+    if isinstance(head, int):
+        raise ValueError("field projections support keys and [*] only")
+    if head == WILDCARD:
+        if not isinstance(data, list):
+            return _MISSING
+        # Keep positions aligned so several [*] fields merge element-wise
+        shaped = (_shape(item, rest) for item in data)
+        return [None if item is _MISSING else item for item in shaped]
+    if not isinstance(data, dict) or head not in data:
+        return _MISSING
+    value = _shape(data[head], rest)
+    return _MISSING if value is _MISSING else {head: value}
+
+
+def _merge(left: Any, right: Any) -> Any:
+    if left is None or right is None:  # An element missing one of the fields
+        return right if left is None else left
+    if isinstance(left, dict) and isinstance(right, dict):
+        merged = dict(left)
+        for key, value in right.items():
+            merged[key] = _merge(merged[key], value) if key in merged else value
+        return merged
+    if isinstance(left, list) and isinstance(right, list) and len(left) == len(right):
+        return [_merge(a, b) for a, b in zip(left, right)]
+    return right
+
+
+def project(data: Any, spec: Union[str, List[str], None]) -> Any:
+    """Applies an action's projection to a parsed response.
+
+    A "$..." JSONPath returns its single match, or the list of matches when
+    the path has a wildcard. A list of field paths keeps just those fields
+    in their original nesting, so templates read them at the same place as
+    in the full response.
+    """
+    if spec is None:
+        return data
+    if isinstance(spec, str):
+        segments = compile_path(spec)
+        matches = _find(data, segments)
+        if WILDCARD in segments:
+            return matches
+        return matches[0] if matches else None
+
+    projected: Any = _MISSING
+    for path in spec:
+        try:
+            shaped = _shape(data, compile_path(path))
+        except ValueError as e:
+            raise ValueError(f"Invalid field projection '{path}': {e}")
+        if shaped is _MISSING:
+            continue
+        projected = shaped if projected is _MISSING else _merge(projected, shaped)
+    return {} if projected is _MISSING else projected
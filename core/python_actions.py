@@ -0,0 +1,163 @@
+import asyncio
+import importlib
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set
+import config
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+    from multiprocessing.process import BaseProcess
+
+logger = logging.getLogger(__name__)
+
+PythonAction = Callable[[Any], Any]
+
+_registry: Dict[str, PythonAction] = {}
+_modules_loaded = False
+
+# Worker processes waiting for a call, and every live one (for shutdown)
+_idle: List["_Worker"] = []
+_workers: Set["_Worker"] = set()
+# Caps calls in flight at PYTHON_ACTION_POOL_SIZE; one per event loop
+_slots: Optional[asyncio.Semaphore] = None
+_slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def python_action(name: str):
+    """Registers a function as the python action `name`.
+
+    The function receives the rendered inputs and returns something JSON
+    serialisable. It runs in a worker process, so it must be defined at
+    module level in one of PYTHON_ACTION_MODULES.
+    """
+
+    def register(fn: PythonAction) -> PythonAction:
+        _registry[name] = fn
+        return fn
+
+    return register
+
+
+def get(name: str) -> PythonAction:
+    global _modules_loaded
+    if not _modules_loaded:
+        for module in config.PYTHON_ACTION_MODULES:
+            importlib.import_module(module)
+        _modules_loaded = True
+    try:
+        return _registry[name]
+    except KeyError:
+        raise ValueError(f"Python action function '{name}' is not registered")
+
+
+def _serve(conn: "Connection"):
+    """Worker process loop: runs one call at a time until the pipe closes"""
+    while True:
+        try:
+            fn, inputs = conn.recv()
+        except EOFError:
+            return
+        except Exception as e:  # The function's module failed to import
+            conn.send((False, RuntimeError(f"Could not load the function: {e!r}")))
+            continue
+        try:
+            reply = (True, fn(inputs))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:  # Result or exception that can't be pickled
+            conn.send((False, RuntimeError(f"Could not return the result: {e!r}")))
+
+
+class _Worker:
+    """A worker process with a pipe to it; it serves one call at a time, so
+    a call that overruns its timeout is stopped by killing just its worker"""
+
+    def __init__(self):
+        # Deferred, like httpx: only processes that run python actions pay
+        # for importing multiprocessing
+        import multiprocessing
+
+        # spawn, not fork: this process has threads (DB pool, to_thread) and
+        # a running event loop that a forked child must not inherit
+        context = multiprocessing.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.process: "BaseProcess" = context.Process(
+            target=_serve, args=(child_conn,), name="python-action", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        _workers.add(self)
+
+    def call(self, fn: PythonAction, inputs: Any):
+        """Blocking round trip; raises EOFError if the worker dies"""
+        # The function is pickled by reference: the worker imports its module
+        self.conn.send((fn, inputs))
+        return self.conn.recv()
+
+    def kill(self):
+        _workers.discard(self)
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots, _slots_loop
+    loop = asyncio.get_running_loop()
+    if _slots_loop is not loop:
+        _slots = asyncio.Semaphore(config.PYTHON_ACTION_POOL_SIZE)
+        _slots_loop = loop
+    return _slots
+
+
+def _checkout() -> _Worker:
+    while _idle:
+        worker = _idle.pop()
+        if worker.process.is_alive():
+            return worker
+        worker.kill()
+    return _Worker()
+
+
+async def run(name: str, inputs: Any, timeout: Optional[float] = None) -> Any:
+    """Calls a registered function in a worker process.
+
+    At most PYTHON_ACTION_POOL_SIZE calls run at once; the others wait for
+    a free worker. Raises TimeoutError after `timeout` seconds
+    (PYTHON_ACTION_TIMEOUT_SECONDS by default) and kills the call's worker;
+    RuntimeError if the worker dies. Calls are never retried here, since
+    one may have partly run; the step fails instead.
+    """
+    fn = get(name)
+    timeout = config.PYTHON_ACTION_TIMEOUT_SECONDS if timeout is None else timeout
+    async with _get_slots():
+        worker = _checkout()
+        healthy = False
+        try:
+            ok, value = await asyncio.wait_for(
+                asyncio.to_thread(worker.call, fn, inputs), timeout
+            )
+            healthy = True
+        except asyncio.TimeoutError:
+            logger.warning(f"Python action '{name}' timed out; killing its worker")
+            raise TimeoutError(f"Python action '{name}' timed out after {timeout}s")
+        except (EOFError, OSError):
+            raise RuntimeError(f"Python action '{name}' failed: its worker died")
+        finally:
+            # A worker still busy with an abandoned call can't take another
+            if healthy:
+                _idle.append(worker)
+            else:
+                worker.kill()
+    if not ok:
+        raise value
+    return value
+
+
+def shutdown():
+    """Stops every worker process, abandoning calls still running"""
+    _idle.clear()
+    for worker in list(_workers):
+        worker.kill()
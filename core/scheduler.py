@@ -0,0 +1,253 @@
+import asyncio
+import heapq
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, UTC
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+import config
+from core import clock, cron
+from core.dispatcher import dispatcher
+from core.executor import FlowExecutor
+from db.models import Job, Lease, Schedule
+from db.session import session_scope
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "scheduler"
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands datetimes back without tzinfo; everything is stored in UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value
+
+
+def next_fire_time(schedule: Schedule, after: datetime) -> datetime:
+    """Returns the schedule's first fire time strictly after `after`"""
+    if schedule.cron:
+        return cron.parse(schedule.cron).next_after(after)
+    return after + timedelta(seconds=schedule.interval_seconds)
+
+
+def plan_fires(
+    schedule: Schedule, due: datetime, now: datetime
+) -> Tuple[List[datetime], datetime]:
+    """Applies the misfire policy to everything due up to `now`.
+
+    Returns the fire times to create jobs for and the next fire time.
+    Fire times later than the grace period are misfires: "skip" drops
+    them, "fire_once" runs one job for all of them and "catch_up" runs
+    each (up to SCHEDULE_MAX_CATCH_UP).
+    """
+    grace = timedelta(
+        seconds=schedule.misfire_grace_seconds or config.SCHEDULE_MISFIRE_GRACE_SECONDS
+    )
+    on_time, missed = [], []
+    fire_at = due
+    if schedule.interval_seconds and not schedule.cron and now - due > grace:
+        # Fast-forward an interval schedule to the last slot before now
+        interval = timedelta(seconds=schedule.interval_seconds)
+        skipped = (now - due - grace) // interval
+        if schedule.misfire_policy == "catch_up":
+            skipped = max(0, skipped - config.SCHEDULE_MAX_CATCH_UP)
+        if skipped:
+            missed.append(due + (skipped - 1) * interval)
+        fire_at = due + skipped * interval
+
+    while fire_at <= now:
+        (missed if now - fire_at > grace else on_time).append(fire_at)
+        fire_at = next_fire_time(schedule, fire_at)
+
+    if schedule.misfire_policy == "catch_up":
+        fires = (missed + on_time)[-config.SCHEDULE_MAX_CATCH_UP :]
+    elif schedule.misfire_policy == "skip" or not missed:
+        fires = on_time
+    else:
+        fires = on_time or missed[-1:]  # fire_once
+    return fires, fire_at
+
+
+def acquire_lease(session, holder: str, ttl: float) -> bool:
+    """Takes or renews the scheduler lease; True while `holder` owns it"""
+    now = clock.now()
+    expires_at = now + timedelta(seconds=ttl)
+    won = session.execute(
+        update(Lease)
+        .where(
+            Lease.name == LEASE_NAME,
+            or_(Lease.holder == holder, Lease.expires_at < now),
+        )
+        .values(holder=holder, expires_at=expires_at)
+    ).rowcount
+    if not won and session.get(Lease, LEASE_NAME) is None:
+        try:
+            session.add(Lease(name=LEASE_NAME, holder=holder, expires_at=expires_at))
+            session.flush()
+            won = 1
+        except IntegrityError:
+            session.rollback()  # Another process created it first
+    session.commit()
+    return bool(won)
+
+
+class ScheduleRunner:
+    """Fires due schedules while this process holds the scheduler lease.
+
+    Next fire times live in a min-heap, so a tick only touches schedules
+    that are actually due. Edits made through the API (in any process) are
+    picked up by querying schedules updated since the last sync. Stale heap
+    entries are skipped lazily.
+    """
+
+    def __init__(self, holder: Optional[str] = None):
+        self.holder = (
+            holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        )
+        self.is_leader = False
+        self._heap: List[Tuple[datetime, str]] = []
+        self._next: Dict[str, datetime] = {}
+        self._synced_at: Optional[datetime] = None
+        self._last_sync = 0.0
+
+    def _push(self, name: str, fire_at: Optional[datetime]):
+        fire_at = _utc(fire_at)
+        if fire_at is None:
+            self._next.pop(name, None)
+        elif self._next.get(name) != fire_at:
+            self._next[name] = fire_at
+            heapq.heappush(self._heap, (fire_at, name))
+
+    def sync(self, session):
+        """Loads schedules changed since the last sync (all of them at first)"""
+        started = clock.now()
+        query = session.query(Schedule.name, Schedule.enabled, Schedule.next_fire_at)
+        if self._synced_at is not None:
+            # Overlap a little so clock skew between writers loses no edits
+            query = query.filter(
+                Schedule.updated_at >= self._synced_at - timedelta(seconds=5)
+            )
+        for name, enabled, next_fire_at in query:
+            self._push(name, next_fire_at if enabled else None)
+        self._synced_at = started
+
+    def _fire(self, session, name: str, now: datetime) -> List[Dict[str, Any]]:
+        schedule = session.get(Schedule, name)
+        if schedule is None or not schedule.enabled or schedule.next_fire_at is None:
+            self._next.pop(name, None)
+            return []
+        due = _utc(schedule.next_fire_at)
+        if due > now:
+            self._push(name, due)  # Rescheduled since we loaded it
+            return []
+
+        fires, next_at = plan_fires(schedule, due, now)
+        # Conditional on the fire time we read, so a job is never created twice
+        # even if leadership changed hands mid-tick
+        claimed = session.execute(
+            update(Schedule)
+            .where(
+                Schedule.name == name, Schedule.next_fire_at == schedule.next_fire_at
+            )
+            .values(
+                next_fire_at=next_at,
+                last_fired_at=fires[-1] if fires else schedule.last_fired_at,
+            )
+        ).rowcount
+        if not claimed:
+            session.rollback()
+            self._next.pop(name, None)
+            self._synced_at = None  # Someone else moved it; reload everything
+            return []
+
+        jobs = []
+        for fire_at in fires:
+            job = Job(
+                id=str(uuid.uuid4()),
+                workflow_name=schedule.workflow_name,
+                status="SCHEDULED",
+                context=dict(schedule.parameters or {}),
+                steps=list(schedule.steps),
+                priority=schedule.priority,
+                message=f"Scheduled by '{name}' for {fire_at.isoformat()}",
+            )
+            session.add(job)
+            jobs.append(
+                {
+                    "job_id": job.id,
+                    "workflow_name": job.workflow_name,
+                    "steps": job.steps,
+                    "parameters": job.context,
+                    "priority": job.priority,
+                }
+            )
+        session.commit()  # Jobs and the new fire time land together
+        self._push(name, next_at)
+        if len(fires) > 1:
+            logger.info(f"Schedule '{name}' caught up {len(fires)} missed run(s)")
+        return jobs
+
+    def tick(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Renews the lease, syncs edits and fires what is due.
+
+        Runs in a worker thread; returns the jobs created for the caller to
+        dispatch on the event loop.
+        """
+        now = now or clock.now()
+        timestamp = now.timestamp()
+        with session_scope() as session:
+            if (
+                not self.is_leader
+                or timestamp - self._last_sync >= config.SCHEDULER_SYNC_SECONDS
+            ):
+                leader = acquire_lease(
+                    session, self.holder, config.SCHEDULER_LEASE_SECONDS
+                )
+                if leader and not self.is_leader:
+                    logger.info(f"Took the scheduler lease as {self.holder}")
+                    self._heap, self._next, self._synced_at = [], {}, None
+                elif not leader and self.is_leader:
+                    logger.info("Lost the scheduler lease")
+                self.is_leader = leader
+                if leader:
+                    self.sync(session)
+                self._last_sync = timestamp
+            if not self.is_leader:
+                return []
+
+            jobs = []
+            while self._heap and self._heap[0][0] <= now:
+                fire_at, name = heapq.heappop(self._heap)
+                if self._next.get(name) != fire_at:
+                    continue  # Superseded by a later push
+                del self._next[name]
+                try:
+                    jobs.extend(self._fire(session, name, now))
+                except Exception as e:
+                    session.rollback()
+                    logger.error(
+                        f"Schedule '{name}' failed to fire: {str(e)}", exc_info=True
+                    )
+                    retry_at = now + timedelta(seconds=config.SCHEDULER_SYNC_SECONDS)
+                    self._push(name, retry_at)
+            return jobs
+
+
+schedule_runner = ScheduleRunner()
+
+
+async def scheduler_loop(interval: float = config.SCHEDULER_TICK_SECONDS):
+    while True:
+        try:
+            for job in await asyncio.to_thread(schedule_runner.tick):
+                executor = FlowExecutor(job["steps"], job["parameters"], job["job_id"])
+                dispatcher.submit(
+                    job["job_id"], job["workflow_name"], executor.run, job["priority"]
+                )
+        except Exception as e:
+            logger.error(f"Scheduler tick failed: {str(e)}", exc_info=True)
+        await clock.sleep(interval)
@@ -0,0 +1,138 @@
+import copy
+import logging
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional
+from sqlalchemy import case, null, select, update
+from sqlalchemy.orm import Session
+from core import clock, job_utils, workflow
+from core.writer import PAUSING, STOPPED
+from db.models import Job
+from db.session import session_scope
+
+logger = logging.getLogger(__name__)
+
+AWAITING_SIGNAL = "AWAITING_SIGNAL"
+# Jobs that may still reach a signal step; deliver_signal buffers for them
+BUFFERING_STATUSES = ("SCHEDULED", "RUNNING", "WAITING", "PAUSED", PAUSING)
+
+
+def save_signal(context: Dict[str, Any], step: Mapping[str, Any], payload: Any):
+    """Merges a signal payload into the context's outputs"""
+    context.setdefault("output", {})[step.get("save_as", step["id"])] = payload
+
+
+def park_job(
+    job_id: str,
+    context: Dict[str, Any],
+    step: Mapping[str, Any],
+    correlation_key: Optional[str],
+    resume_at: Optional[datetime],
+) -> Optional[str]:
+    """Parks a job on a signal step.
+
+    Returns the job's status once it is parked: AWAITING_SIGNAL, or PAUSING
+    or CANCELLING if it is being stopped, which the caller then completes.
+    If a signal was buffered before the job got here it is consumed instead:
+    its payload is saved into the context, None is returned and the job
+    keeps running.
+    """
+    now = clock.now()
+    with session_scope() as session:
+        # Both sides use conditional updates, so a concurrent signal either
+        # sees the parked job or is buffered before we get here
+        parked = session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.signal_payload.is_(None))
+            .values(
+                # A pause or cancel in progress keeps its status
+                status=case(
+                    (Job.status.in_(STOPPED), Job.status), else_=AWAITING_SIGNAL
+                ),
+                context=context,
+                current_step_id=step["id"],
+                correlation_key=correlation_key,
+                resume_at=resume_at,
+                updated_at=now,
+            )
+        ).rowcount
+        if parked:
+            return session.execute(
+                select(Job.status).where(Job.id == job_id)
+            ).scalar_one()
+
+        row = session.execute(
+            select(Job.signal_payload).where(Job.id == job_id)
+        ).first()
+        if row is None:
+            raise ValueError(f"Job '{job_id}' no longer exists")
+        save_signal(context, step, row.signal_payload)
+        session.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(
+                signal_payload=null(),
+                context=context,
+                current_step_id=step["id"],
+                updated_at=now,
+            )
+        )
+    logger.info(f"[Job {job_id}] Consumed signal buffered before step '{step['id']}'")
+    return None
+
+
+def deliver_signal(
+    session: Session, job_id: str, payload: Any, buffer: bool = True
+) -> Optional[str]:
+    """Hands a signal to a job.
+
+    Returns "resumed" when the job was parked on a signal step and has been
+    claimed (status RUNNING, payload saved to its context), "buffered" when
+    the job has not reached its signal step yet, and None otherwise, including
+    for a running job with no signal step left ahead of it.
+    """
+    now = clock.now()
+    claimed = session.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == AWAITING_SIGNAL)
+        .values(status="RUNNING", correlation_key=None, updated_at=now)
+    ).rowcount
+    if claimed:
+        job = session.get(Job, job_id)
+        step = workflow.get_plan(job.steps).step(job.current_step_id)
+        context = copy.deepcopy(dict(job.context))
+        save_signal(context, step, payload)
+        job.context = context
+        session.commit()
+        logger.info(f"[Job {job_id}] Signal received at step '{step['id']}'")
+        return "resumed"
+
+    if not buffer:
+        return None
+    job = session.get(Job, job_id)
+    if job is None or job.status not in BUFFERING_STATUSES:
+        return None
+    try:
+        plan = workflow.get_plan(job.steps)
+    except workflow.WorkflowError:
+        return None
+    if not plan.reaches(job_utils.get_resume_index(job), "wait_for_signal"):
+        # Nothing would ever consume it
+        return None
+    # Conditional on the step we checked from, in case the job moved on since
+    buffered = session.execute(
+        update(Job)
+        .where(
+            Job.id == job_id,
+            Job.status == job.status,
+            (
+                Job.current_step_id.is_(None)
+                if job.current_step_id is None
+                else Job.current_step_id == job.current_step_id
+            ),
+            Job.signal_payload.is_(None),
+        )
+        .values(signal_payload=payload)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    session.commit()
+    return "buffered" if buffered else None
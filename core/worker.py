@@ -0,0 +1,40 @@
+import asyncio
+import logging
+from typing import Coroutine, List
+import config
+from core import python_actions
+from core.archiver import archive_loop
+from core.job_resumer import heartbeat_loop, recovery_loop, resume_loop
+from core.profiling import loop_lag_monitor
+from core.scheduler import scheduler_loop
+from core.writer import state_writer
+
+logger = logging.getLogger(__name__)
+
+
+def background_loops(resume: bool = False) -> List[Coroutine]:
+    """Heartbeats, orphaned job recovery, archival of finished jobs and
+    recurring schedules (fired only by the process holding the lease).
+
+    With resume=True the process also resumes due WAITING jobs, which is
+    otherwise left to cron-driven resumer runs. The loop-lag monitor runs
+    when LOOP_LAG_MONITOR is on.
+    """
+    loops = [heartbeat_loop(), recovery_loop(), archive_loop(), scheduler_loop()]
+    if resume:
+        loops.append(resume_loop())
+    if config.LOOP_LAG_MONITOR:
+        loops.append(loop_lag_monitor.run())
+    return loops
+
+
+async def run_worker():
+    tasks = [asyncio.create_task(loop) for loop in background_loops(resume=True)]
+    logger.info(f"Worker running {len(tasks)} background loops")
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await state_writer.close()
+        python_actions.shutdown()
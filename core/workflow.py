@@ -0,0 +1,183 @@
+import copy
+import functools
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from jinja2 import TemplateSyntaxError
+
+from core import codec, expressions
+
+STEP_TYPES = {"task", "wait", "choice", "wait_for_signal"}
+# Steps that suspend the job, so a loop through one of them is not a busy loop
+PAUSING_TYPES = {"wait", "wait_for_signal"}
+
+
+class WorkflowError(ValueError):
+    """Raised when a workflow definition fails static validation"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """Validated, immutable view of a workflow's steps"""
+
+    steps: Tuple[Mapping[str, Any], ...]
+    index: Mapping[str, int]
+    successors: Tuple[Tuple[int, ...], ...]
+    action_names: FrozenSet[str]
+
+    def step(self, step_id: Optional[str]) -> Optional[Mapping[str, Any]]:
+        i = self.index.get(step_id)
+        return None if i is None else self.steps[i]
+
+    def next_index(self, i: int, result: Optional[str]) -> int:
+        """Returns the index to run after step i (len(steps) once finished)"""
+        if self.steps[i]["type"] == "choice":
+            return self.index[result]
+        return i + 1
+
+    def reaches(self, i: int, step_type: str) -> bool:
+        """Whether a step of step_type can still run when continuing at step i"""
+        return any(
+            self.steps[j]["type"] == step_type for j in _reachable(self.successors, i)
+        )
+
+
+def _reachable(successors, start: int) -> set:
+    """Indices reachable from `start`, itself included (none once finished)"""
+    if start >= len(successors):
+        return set()
+    reachable = {start}
+    frontier = [start]
+    while frontier:
+        for nxt in successors[frontier.pop()]:
+            if nxt not in reachable:
+                reachable.add(nxt)
+                frontier.append(nxt)
+    return reachable
+
+
+def _targets(step: Dict[str, Any]) -> List[str]:
+    targets = []
+    if step.get("type") == "wait_for_signal" and "on_timeout" in step:
+        targets.append(step["on_timeout"])
+    for cond in step.get("conditions", []):
+        if "if" in cond:
+            targets.append(cond.get("next"))
+        if "default" in cond:
+            targets.append(cond["default"])
+    return targets
+
+
+def _find_busy_loop(steps: List[Dict[str, Any]], successors) -> Optional[List[str]]:
+    """Returns a cycle that never passes through a wait step, if there is one"""
+    state = {}  # index -> 1 while on the DFS stack, 2 when finished
+    for root in range(len(steps)):
+        if root in state or steps[root]["type"] in PAUSING_TYPES:
+            continue
+        path = [root]
+        stack = [iter(successors[root])]
+        state[root] = 1
+        while stack:
+            nxt = next(stack[-1], None)
+            if nxt is None:
+                state[path.pop()] = 2
+                stack.pop()
+            elif steps[nxt]["type"] in PAUSING_TYPES or state.get(nxt) == 2:
+                continue
+            elif state.get(nxt) == 1:
+                cycle = path[path.index(nxt) :] + [nxt]
+                return [steps[j]["id"] for j in cycle]
+            else:
+                state[nxt] = 1
+                path.append(nxt)
+                stack.append(iter(successors[nxt]))
+    return None
+
+
+def compile_workflow(steps: List[Dict[str, Any]]) -> ExecutionPlan:
+    """Validates the steps and builds an execution plan, raising WorkflowError"""
+    if not steps:
+        raise WorkflowError(["Workflow must define at least one step"])
+
+    errors = []
+    index = {}
+    step_ids = {step.get("id") for step in steps}
+    for i, step in enumerate(steps):
+        step_id = step.get("id")
+        if not step_id:
+            errors.append(f"Step at position {i} has no 'id'")
+        elif step_id in index:
+            errors.append(f"Duplicate step ID '{step_id}'")
+        else:
+            index[step_id] = i
+        if step.get("type") not in STEP_TYPES:
+            errors.append(f"Step '{step_id}': unsupported type '{step.get('type')}'")
+        elif step["type"] == "task" and not step.get("action"):
+            errors.append(f"Step '{step_id}': task step has no 'action'")
+        elif step["type"] == "wait":
+            if "duration" not in step:
+                errors.append(f"Step '{step_id}': wait step has no 'duration'")
+            else:
+                try:
+                    expressions.compile_template(str(step["duration"]))
+                except TemplateSyntaxError as e:
+                    errors.append(f"Step '{step_id}': invalid duration template: {e}")
+        elif step["type"] == "choice":
+            if not step.get("conditions"):
+                errors.append(f"Step '{step_id}': choice step has no 'conditions'")
+        elif step["type"] == "wait_for_signal":
+            for field in ("correlation_key", "timeout"):
+                if step.get(field) is None:
+                    continue
+                try:
+                    expressions.compile_template(str(step[field]))
+                except TemplateSyntaxError as e:
+                    errors.append(f"Step '{step_id}': invalid {field} template: {e}")
+        for target in _targets(step):
+            if target not in step_ids:
+                errors.append(f"Step '{step_id}': unknown next step '{target}'")
+    errors.extend(expressions.validate_conditions(steps))
+    if errors:
+        raise WorkflowError(errors)
+
+    successors = []
+    for i, step in enumerate(steps):
+        if step["type"] == "choice":
+            succ = tuple(dict.fromkeys(index[t] for t in _targets(step)))
+        else:
+            succ = (i + 1,) if i + 1 < len(steps) else ()
+            succ += tuple(index[t] for t in _targets(step) if index[t] not in succ)
+        successors.append(succ)
+
+    reachable = _reachable(successors, 0)
+    unreachable = [s["id"] for i, s in enumerate(steps) if i not in reachable]
+    if unreachable:
+        errors.append(f"Unreachable steps: {', '.join(unreachable)}")
+
+    loop = _find_busy_loop(steps, successors)
+    if loop:
+        errors.append(f"Loop without a wait step: {' -> '.join(loop)}")
+    if errors:
+        raise WorkflowError(errors)
+
+    return ExecutionPlan(
+        steps=tuple(MappingProxyType(copy.deepcopy(s)) for s in steps),
+        index=MappingProxyType(index),
+        successors=tuple(successors),
+        action_names=frozenset(s["action"] for s in steps if s["type"] == "task"),
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_cached(fingerprint: str) -> ExecutionPlan:
+    return compile_workflow(codec.loads(fingerprint))
+
+
+def get_plan(steps: List[Dict[str, Any]]) -> ExecutionPlan:
+    """Returns the cached execution plan for a workflow definition"""
+    return _compile_cached(codec.dumps(steps, sort_keys=True))
@@ -0,0 +1,172 @@
+import asyncio
+import copy
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import and_, bindparam, case, or_, select, update
+import config
+from db.models import Job
+from db.session import session_scope
+
+logger = logging.getLogger(__name__)
+
+_jobs = Job.__table__
+
+# A pause or cancel waiting for the job's owner to checkpoint. Until then
+# status writes leave it in place, except for its outcome or the job ending.
+PAUSING = "PAUSING"
+CANCELLING = "CANCELLING"
+STOPPED = {PAUSING: "PAUSED", CANCELLING: "CANCELLED"}
+_ENDS_STOPPING = ("PAUSED", "CANCELLED", "COMPLETED", "FAILED")
+
+
+class StateWriter:
+    """Group-commits job state updates from many concurrent executors.
+
+    Updates are queued and flushed by a single task, either every
+    WRITE_FLUSH_INTERVAL_MS or once WRITE_BATCH_SIZE updates are pending.
+    Several updates to the same job inside one batch are merged, and the
+    whole batch is written in one transaction off the event loop.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = config.WRITE_BATCH_SIZE,
+        flush_interval_ms: float = config.WRITE_FLUSH_INTERVAL_MS,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+        return self._queue
+
+    async def write(
+        self, job_id: str, values: Dict[str, Any], durable: bool = True
+    ) -> Optional[str]:
+        """Queues column updates for a job.
+
+        With durable=True (the default) this returns once the batch holding
+        the update has committed, and raises if it failed. If a status
+        change was held back because the job is being paused or cancelled,
+        it returns that status (PAUSING or CANCELLING), otherwise None.
+        With durable=False the values are copied and the call returns
+        immediately.
+        """
+        queue = self._ensure_started()
+        if not durable:
+            queue.put_nowait((job_id, copy.deepcopy(values), None))
+            return None
+        future = self._loop.create_future()
+        queue.put_nowait((job_id, values, future))
+        return await future
+
+    async def close(self):
+        """Flushes everything queued so far and stops the flush task"""
+        if self._task is None or self._task.done():
+            return
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = self._loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[str, Dict[str, Any], Any]]):
+        merged: Dict[str, Dict[str, Any]] = {}
+        for job_id, values, _ in batch:
+            merged.setdefault(job_id, {}).update(values)
+
+        errors: Dict[str, Exception] = {}
+        held: Dict[str, str] = {}
+        try:
+            held = await asyncio.to_thread(_write_rows, merged)
+        except Exception as e:
+            logger.warning(
+                f"Batched write of {len(merged)} job(s) failed, retrying one by one: {str(e)}"
+            )
+            # Isolate the failing job(s) so the rest of the batch still commits
+            for job_id, values in merged.items():
+                try:
+                    held.update(await asyncio.to_thread(_write_rows, {job_id: values}))
+                except Exception as job_error:
+                    logger.error(f"[Job {job_id}] State write failed: {job_error}")
+                    errors[job_id] = job_error
+
+        for job_id, _, future in batch:
+            if future is None or future.done():
+                continue
+            if job_id in errors:
+                future.set_exception(errors[job_id])
+            else:
+                future.set_result(held.get(job_id))
+
+
+def _write_rows(merged: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """Writes the rows and returns {job_id: status} for the jobs whose status
+    change was held back by a pause or cancel in progress"""
+    # executemany needs one statement per distinct set of columns
+    groups: Dict[frozenset, List[Dict[str, Any]]] = {}
+    for job_id, values in merged.items():
+        row = {"_id": job_id, **{f"_{k}": v for k, v in values.items()}}
+        groups.setdefault(frozenset(values), []).append(row)
+
+    with session_scope() as session:
+        connection = session.connection()
+        for columns, rows in groups.items():
+            values = {column: bindparam(f"_{column}") for column in columns}
+            if "status" in columns:
+                # Spelled out: executemany can't expand IN lists
+                values["status"] = case(
+                    (
+                        and_(
+                            or_(*(_jobs.c.status == s for s in STOPPED)),
+                            *(bindparam("_status") != s for s in _ENDS_STOPPING),
+                        ),
+                        _jobs.c.status,
+                    ),
+                    else_=bindparam("_status"),
+                )
+            stmt = update(_jobs).where(_jobs.c.id == bindparam("_id")).values(values)
+            connection.execute(stmt, rows)
+
+        status_writes = [
+            job_id for job_id, values in merged.items() if "status" in values
+        ]
+        if not status_writes:
+            return {}
+        return dict(
+            connection.execute(
+                select(_jobs.c.id, _jobs.c.status).where(
+                    _jobs.c.id.in_(status_writes), _jobs.c.status.in_(STOPPED)
+                )
+            ).all()
+        )
+
+
+state_writer = StateWriter()
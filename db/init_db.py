@@ -1,8 +1,28 @@
 # karya/db/init_db.py
 
+import logging
+from sqlalchemy.engine import Engine
 from db.models import Base
 from db.session import engine
 
+logger = logging.getLogger(__name__)
+
+
+def enable_incremental_vacuum(engine: Engine):
+    """Switches a SQLite database to incremental auto_vacuum, so that the
+    archiver can hand free pages back to the filesystem"""
+    raw = engine.raw_connection()
+    try:
+        sqlite_conn = raw.driver_connection
+        if sqlite_conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            # Incremental mode only takes effect after one full VACUUM
+            logger.info("Enabling incremental auto_vacuum (one-time VACUUM)")
+            sqlite_conn.executescript("PRAGMA auto_vacuum = INCREMENTAL; VACUUM;")
+    finally:
+        raw.close()
+
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    if engine.dialect.name == "sqlite":
+        enable_incremental_vacuum(engine)
@@ -1,7 +1,16 @@
 # karya/db/models.py
 
-from sqlalchemy import Column, String, Text, DateTime
-from sqlalchemy.dialects.sqlite import JSON
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    Integer,
+    String,
+    Text,
+    DateTime,
+    LargeBinary,
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.ext.mutable import MutableDict, MutableList
 from sqlalchemy.sql import func
@@ -10,22 +19,30 @@ from sqlalchemy.sql import func
 Base = declarative_base()
 
 
+def json_type():
+    """Binary JSONB on PostgreSQL, JSON text everywhere else"""
+    return JSON().with_variant(JSONB(), "postgresql")
+
+
 class Job(Base):
     __tablename__ = "jobs"
 
     id = Column(String, primary_key=True, index=True)
     workflow_name = Column(String, nullable=False)
     status = Column(String, default="PENDING")
-    context = Column(MutableDict.as_mutable(JSON), nullable=True)
-    steps = Column(MutableList.as_mutable(JSON), nullable=True)
+    context = Column(MutableDict.as_mutable(json_type()), nullable=True)
+    steps = Column(MutableList.as_mutable(json_type()), nullable=True)
     current_step_id = Column(
         String, nullable=True
     )
     step_retry_counts = Column(
-        MutableDict.as_mutable(JSON), nullable=True
+        MutableDict.as_mutable(json_type()), nullable=True
     )
     resume_at = Column(DateTime, nullable=True)  # ⏰ For resuming wait steps
     message = Column(Text, nullable=True)
+    correlation_key = Column(String, nullable=True, index=True)  # For signal waits
+    signal_payload = Column(json_type(), nullable=True)  # Signal sent before parking
+    priority = Column(Integer, nullable=False, default=0, server_default="0")
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -35,5 +52,45 @@ class Action(Base):
     __tablename__ = "actions"
 
     name = Column(String(100), primary_key=True)
-    type = Column(String(20), nullable=False)  # 'http' or 'lambda'
-    config = Column(MutableDict.as_mutable(JSON), nullable=True)
+    type = Column(String(20), nullable=False)  # 'http' or 'python'
+    config = Column(MutableDict.as_mutable(json_type()), nullable=True)
+
+
+class ArchivedJob(Base):
+    __tablename__ = "archived_jobs"
+
+    id = Column(String, primary_key=True)
+    workflow_name = Column(String, nullable=False, index=True)
+    status = Column(String, nullable=False)
+    archived_on = Column(String(10), nullable=False, index=True)  # Day partition
+    created_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+    payload = Column(LargeBinary, nullable=False)  # zlib-compressed JSON of the job
+
+
+class Schedule(Base):
+    __tablename__ = "schedules"
+
+    name = Column(String(100), primary_key=True)
+    workflow_name = Column(String, nullable=False)
+    steps = Column(MutableList.as_mutable(json_type()), nullable=False)
+    parameters = Column(MutableDict.as_mutable(json_type()), nullable=True)
+    cron = Column(String(100), nullable=True)  # Either a cron expression...
+    interval_seconds = Column(Integer, nullable=True)  # ...or a fixed interval
+    priority = Column(Integer, nullable=False, default=0)
+    misfire_policy = Column(String(20), nullable=False, default="fire_once")
+    misfire_grace_seconds = Column(Integer, nullable=True)
+    enabled = Column(Boolean, nullable=False, default=True)
+    next_fire_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    last_fired_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+
+class Lease(Base):
+    __tablename__ = "leases"
+
+    name = Column(String(100), primary_key=True)
+    holder = Column(String, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -8,6 +8,7 @@ class JobRequest(BaseModel):
     workflow_name: str
     parameters: Dict[str, Any]
     steps: List[Dict[str, Any]]
+    priority: int = 0  # Higher runs first within its workflow
 
 
 class JobStatus(BaseModel):
@@ -25,3 +26,23 @@ class ActionSchema(BaseModel):
 class ActionUpdateSchema(BaseModel):
     type: str
     config: Dict[str, Any]
+
+
+class SignalRequest(BaseModel):
+    payload: Dict[str, Any] = {}
+
+
+class ScheduleUpdateSchema(BaseModel):
+    workflow_name: str
+    steps: List[Dict[str, Any]]
+    parameters: Dict[str, Any] = {}
+    cron: Optional[str] = None
+    interval_seconds: Optional[int] = None
+    priority: int = 0
+    misfire_policy: Literal["skip", "fire_once", "catch_up"] = "fire_once"
+    misfire_grace_seconds: Optional[int] = None
+    enabled: bool = True
+
+
+class ScheduleSchema(ScheduleUpdateSchema):
+    name: str
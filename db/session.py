@@ -1,8 +1,165 @@
 # karya/db/session.py
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from config import DATABASE_URL
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
+import config
+from core import codec
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+class PoolStats:
+    """Connection checkout counters, shared by every engine in the process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.in_use = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_checkout(self):
+        with self._lock:
+            self.in_use += 1
+
+    def record_checkin(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "connections_in_use": self.in_use,
+                "checkouts": self.checkouts,
+                "checkout_wait_seconds_total": round(self.wait_seconds_total, 6),
+                "checkout_wait_seconds_avg": (
+                    round(self.wait_seconds_total / self.checkouts, 6)
+                    if self.checkouts
+                    else 0.0
+                ),
+                "checkout_wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_stats.record_wait(time.perf_counter() - start)
+
+
+def _track_checkouts(engine: Engine):
+    event.listen(engine, "checkout", lambda *_: pool_stats.record_checkout())
+    event.listen(engine, "checkin", lambda *_: pool_stats.record_checkin())
+
+
+def _create_sqlite_engine(url) -> Engine:
+    if url.database in (None, "", ":memory:"):
+        # Every connection to an in-memory database would see an empty one
+        return create_engine(
+            url,
+            json_serializer=codec.dumps,
+            json_deserializer=codec.loads,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+
+    engine = create_engine(
+        url,
+        json_serializer=codec.dumps,
+        json_deserializer=codec.loads,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": config.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        },
+        poolclass=InstrumentedQueuePool,
+        pool_size=config.SQLITE_POOL_SIZE,
+        max_overflow=config.SQLITE_MAX_OVERFLOW,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, _):
+        # WAL lets readers proceed while the single writer commits, and
+        # synchronous=NORMAL only fsyncs at checkpoints instead of every commit
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.close()
+
+    return engine
+
+
+def _create_server_engine(url) -> Engine:
+    return create_engine(
+        url,
+        json_serializer=codec.dumps,
+        json_deserializer=codec.loads,
+        poolclass=InstrumentedQueuePool,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_recycle=config.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=True,
+    )
+
+
+def create_db_engine(database_url: str) -> Engine:
+    """Creates an engine tuned for the backend named in the URL"""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        engine = _create_sqlite_engine(url)
+    else:
+        engine = _create_server_engine(url)
+    _track_checkouts(engine)
+    return engine
+
+
+engine = create_db_engine(config.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def get_db() -> Iterator[Session]:
+    """FastAPI dependency: one session per request, always closed afterwards"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """Short unit of work: commits on success, rolls back on error, then closes"""
+    session = SessionLocal()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def get_pool_status() -> Dict[str, Any]:
+    """Pool occupancy and checkout wait times, to make session leaks visible"""
+    status = pool_stats.snapshot()
+    status["pool"] = engine.pool.status()
+    return status
@@ -1,21 +1,56 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from api.jobs import router as job_router
 from api.actions import router as actions_router
-from api.mock_routes import router as mock_router
-from db.init_db import init_db
-import uvicorn
+from api.admin import router as admin_router
+from api.archive import router as archive_router
+from api.metrics import router as metrics_router
+from api.responses import CodecJSONResponse
+from api.schedules import router as schedules_router
+import asyncio
+import config
+
+# Schema setup is not done on import; `python cli.py api` runs it at startup
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from core import python_actions
+    from core.job_resumer import heartbeat_loop
+    from core.writer import state_writer
+
+    if config.API_RUN_WORKER:
+        from core.worker import background_loops
+
+        loops = background_loops()
+    else:
+        # Jobs started through the API run in this process and need heartbeats
+        loops = [heartbeat_loop()]
+        if config.LOOP_LAG_MONITOR:
+            from core.profiling import loop_lag_monitor
+
+            loops.append(loop_lag_monitor.run())
+    tasks = [asyncio.create_task(loop) for loop in loops]
+    yield
+    for task in tasks:
+        task.cancel()
+    await state_writer.close()
+    python_actions.shutdown()
 
-# Initialize DB (for dev/testing)
-init_db()
 
 # Create FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=CodecJSONResponse)
 
 # Include routers
 app.include_router(job_router)
 app.include_router(actions_router)
-app.include_router(mock_router)
+app.include_router(archive_router)
+app.include_router(metrics_router)
+app.include_router(schedules_router)
+app.include_router(admin_router)
 
 # Start app via CLI
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    from cli import main
+
+    main(["api", "--reload"])
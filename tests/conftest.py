@@ -0,0 +1,53 @@
+import os
+import tempfile
+
+# Must run before anything imports config/db.session: tests get a scratch
+# SQLite file instead of ./karya.db, and app lifespans start only the
+# heartbeat, not the full set of background loops. A session fixture
+# (tmp_path_factory) would run too late, after test modules import the app.
+_scratch = tempfile.mkdtemp(prefix="karya-tests-")
+os.environ["KARYA_DATABASE_URL"] = f"sqlite:///{_scratch}/karya.db"
+os.environ.setdefault("KARYA_API_RUN_WORKER", "0")
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from db.init_db import init_db  # noqa: E402
+from db.models import Base  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    # main.py no longer creates tables on import; tests that reach the
+    # default database need them
+    init_db()
+
+
+@pytest.fixture
+def memory_engine():
+    """A private in-memory SQLite database with the schema created"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_targets():
+    # Where session_factory installs itself; a module overrides this when
+    # the code under test imported SessionLocal by name
+    return ("db.session.SessionLocal",)
+
+
+@pytest.fixture
+def session_factory(memory_engine, session_targets, mocker):
+    factory = sessionmaker(bind=memory_engine)
+    for target in session_targets:
+        mocker.patch(target, factory)
+    return factory
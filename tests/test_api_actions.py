@@ -23,7 +23,7 @@ def action_data():
 
 def test_create_action_success(action_data, mocker):
     mock_db = MagicMock()
-    mocker.patch("api.actions.SessionLocal", return_value=mock_db)
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
     mock_db.query.return_value.filter.return_value.first.return_value = None
 
     response = client.post("/actions", json=action_data)
@@ -36,7 +36,7 @@ def test_create_action_success(action_data, mocker):
 
 def test_create_action_conflict(action_data, mocker):
     mock_db = MagicMock()
-    mocker.patch("api.actions.SessionLocal", return_value=mock_db)
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
     mock_db.query.return_value.filter.return_value.first.return_value = Action(
         **action_data
     )
@@ -50,7 +50,7 @@ def test_create_action_conflict(action_data, mocker):
 def test_get_action_success(action_data, mocker):
     mock_db = MagicMock()
     mock_action = Action(**action_data)
-    mocker.patch("api.actions.SessionLocal", return_value=mock_db)
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
     mock_db.query.return_value.filter.return_value.first.return_value = mock_action
 
     response = client.get(f"/actions/{action_data['name']}")
@@ -61,7 +61,7 @@ def test_get_action_success(action_data, mocker):
 
 def test_get_action_not_found(mocker):
     mock_db = MagicMock()
-    mocker.patch("api.actions.SessionLocal", return_value=mock_db)
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
     mock_db.query.return_value.filter.return_value.first.return_value = None
 
     response = client.get("/actions/NonExistent")
@@ -73,7 +73,7 @@ def test_get_action_not_found(mocker):
 def test_update_action_success(action_data, mocker):
     mock_db = MagicMock()
     existing_action = Action(**action_data)
-    mocker.patch("api.actions.SessionLocal", return_value=mock_db)
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
     mock_db.query.return_value.filter.return_value.first.return_value = existing_action
 
     updated = action_data.copy()
@@ -90,7 +90,7 @@ def test_update_action_success(action_data, mocker):
 
 def test_update_action_not_found(action_data, mocker):
     mock_db = MagicMock()
-    mocker.patch("api.actions.SessionLocal", return_value=mock_db)
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
     mock_db.query.return_value.filter.return_value.first.return_value = None
 
     response = client.put(f"/actions/{action_data['name']}", json=action_data)
@@ -102,7 +102,7 @@ def test_update_action_not_found(action_data, mocker):
 def test_delete_action_success(action_data, mocker):
     mock_db = MagicMock()
     mock_action = Action(**action_data)
-    mocker.patch("api.actions.SessionLocal", return_value=mock_db)
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
     mock_db.query.return_value.filter.return_value.first.return_value = mock_action
 
     response = client.delete(f"/actions/{action_data['name']}")
@@ -115,7 +115,7 @@ def test_delete_action_success(action_data, mocker):
 
 def test_delete_action_not_found(mocker):
     mock_db = MagicMock()
-    mocker.patch("api.actions.SessionLocal", return_value=mock_db)
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
     mock_db.query.return_value.filter.return_value.first.return_value = None
 
     response = client.delete("/actions/NonExistent")
@@ -130,7 +130,7 @@ def test_list_actions(mocker):
         Action(name="A1", type="http", config={}),
         Action(name="A2", type="http", config={}),
     ]
-    mocker.patch("api.actions.SessionLocal", return_value=mock_db)
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
     mock_db.query.return_value.all.return_value = actions
 
     response = client.get("/actions")
@@ -0,0 +1,28 @@
+from fastapi.testclient import TestClient
+
+from api.admin import router
+from main import app
+
+app.include_router(router)
+client = TestClient(app)
+
+
+def test_loop_lag_snapshot():
+    response = client.get("/admin/loop-lag")
+
+    assert response.status_code == 200
+    assert response.json()["enabled"] is False
+    assert response.json()["recent_stalls"] == []
+
+
+def test_profile_returns_folded_stacks():
+    response = client.post("/admin/profile?seconds=0.1")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert int(response.headers["X-Samples-Total"]) > 0
+
+
+def test_profile_duration_is_bounded():
+    assert client.post("/admin/profile?seconds=0").status_code == 422
+    assert client.post("/admin/profile?seconds=3600").status_code == 422
@@ -0,0 +1,66 @@
+from unittest.mock import MagicMock
+
+from fastapi.testclient import TestClient
+
+from api.archive import router
+from core.archiver import compress_job
+from db.models import ArchivedJob, Job
+from main import app
+
+app.include_router(router)
+client = TestClient(app)
+
+
+def make_archived():
+    job = Job(
+        id="job-1", workflow_name="wf", status="COMPLETED", context={"output": {}}
+    )
+    return ArchivedJob(
+        id=job.id,
+        workflow_name=job.workflow_name,
+        status=job.status,
+        archived_on="2026-01-01",
+        payload=compress_job(job),
+    )
+
+
+def test_get_archived_job(mocker):
+    mock_db = MagicMock()
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
+    mock_db.query.return_value.filter.return_value.first.return_value = make_archived()
+
+    response = client.get("/archive/jobs/job-1")
+
+    assert response.status_code == 200
+    assert response.json()["job_id"] == "job-1"
+    assert response.json()["context"] == {"output": {}}
+
+
+def test_get_archived_job_not_found(mocker):
+    mock_db = MagicMock()
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
+    mock_db.query.return_value.filter.return_value.first.return_value = None
+
+    response = client.get("/archive/jobs/missing")
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Archived job not found"
+
+
+def test_list_archived_jobs(mocker):
+    mock_db = MagicMock()
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
+    query = mock_db.query.return_value.filter.return_value
+    query.limit.return_value.all.return_value = [make_archived()]
+
+    response = client.get("/archive/jobs?day=2026-01-01")
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "job_id": "job-1",
+            "workflow_name": "wf",
+            "status": "COMPLETED",
+            "archived_on": "2026-01-01",
+        }
+    ]
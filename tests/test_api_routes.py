@@ -29,12 +29,13 @@ def job_data():
 
 def test_start_job_success(client, job_data, mocker):
     mock_db = MagicMock()
-    mocker.patch("api.jobs.SessionLocal", return_value=mock_db)
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
     mock_executor = MagicMock()
     mocker.patch("api.jobs.FlowExecutor", return_value=mock_executor)
-    mocker.patch("api.jobs.asyncio.create_task", return_value=MagicMock())
+    dispatcher = mocker.patch("api.jobs.dispatcher")
 
     # Just simulate DB behaviors
+    mock_db.query.return_value.filter.return_value.all.return_value = [("DummyAction",)]
     mock_db.add.return_value = None
     mock_db.commit.return_value = None
     mock_db.refresh.side_effect = lambda job: setattr(job, "id", job.id)
@@ -47,6 +48,39 @@ def test_start_job_success(client, job_data, mocker):
     # Validate UUID format
     assert re.fullmatch(r"[a-f0-9\-]{36}", data["job_id"])
     assert data["status"] == "SCHEDULED"
+    dispatcher.submit.assert_called_once_with(
+        data["job_id"], "TestFlow", mock_executor.run, 0
+    )
+
+
+def test_start_job_invalid_condition(client, job_data, mocker):
+    mock_db = MagicMock()
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
+    job_data["steps"].append(
+        {
+            "id": "decide",
+            "type": "choice",
+            "conditions": [{"if": "context.key ==", "next": "step1"}],
+        }
+    )
+
+    response = client.post("/jobs", json=job_data)
+
+    assert response.status_code == 422
+    assert "decide" in response.json()["detail"][0]
+    mock_db.add.assert_not_called()
+
+
+def test_start_job_unknown_action(client, job_data, mocker):
+    mock_db = MagicMock()
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
+    mock_db.query.return_value.filter.return_value.all.return_value = []
+
+    response = client.post("/jobs", json=job_data)
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == ["Unknown action 'DummyAction'"]
+    mock_db.add.assert_not_called()
 
 
 def test_get_job_steps_success(client, mocker):
@@ -55,7 +89,7 @@ def test_get_job_steps_success(client, mocker):
         id=job_id, workflow_name="flow", status="SCHEDULED", steps=[{"id": "a"}]
     )
     mocker.patch(
-        "api.jobs.SessionLocal",
+        "db.session.SessionLocal",
         return_value=MagicMock(
             query=MagicMock(
                 return_value=MagicMock(
@@ -74,7 +108,7 @@ def test_get_job_steps_success(client, mocker):
 
 def test_get_job_steps_not_found(client, mocker):
     mocker.patch(
-        "api.jobs.SessionLocal",
+        "db.session.SessionLocal",
         return_value=MagicMock(
             query=MagicMock(
                 return_value=MagicMock(
@@ -97,7 +131,7 @@ def test_get_job_status_success(client, mocker):
         id=job_id, workflow_name="TestFlow", status="RUNNING", context={"key": "val"}
     )
     mocker.patch(
-        "api.jobs.SessionLocal",
+        "db.session.SessionLocal",
         return_value=MagicMock(
             query=MagicMock(
                 return_value=MagicMock(
@@ -116,7 +150,7 @@ def test_get_job_status_success(client, mocker):
 
 def test_get_job_status_not_found(client, mocker):
     mocker.patch(
-        "api.jobs.SessionLocal",
+        "db.session.SessionLocal",
         return_value=MagicMock(
             query=MagicMock(
                 return_value=MagicMock(
@@ -137,7 +171,7 @@ def test_delete_job_success(client, mocker):
     mock_job = Job(id=job_id, workflow_name="Test", status="SCHEDULED", context={})
     mock_db = MagicMock()
     mock_db.query.return_value.filter.return_value.first.return_value = mock_job
-    mocker.patch("api.jobs.SessionLocal", return_value=mock_db)
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
 
     response = client.delete(f"/jobs/{job_id}")
     assert response.status_code == 200
@@ -146,7 +180,7 @@ def test_delete_job_success(client, mocker):
 
 def test_delete_job_not_found(client, mocker):
     mocker.patch(
-        "api.jobs.SessionLocal",
+        "db.session.SessionLocal",
         return_value=MagicMock(
             query=MagicMock(
                 return_value=MagicMock(
@@ -165,7 +199,7 @@ def test_delete_job_not_found(client, mocker):
 def test_list_jobs(client, mocker):
     job = Job(id="1", workflow_name="wf", status="SCHEDULED", context={"x": 1})
     mocker.patch(
-        "api.jobs.SessionLocal",
+        "db.session.SessionLocal",
         return_value=MagicMock(
             query=MagicMock(return_value=MagicMock(all=MagicMock(return_value=[job])))
         ),
@@ -176,8 +210,106 @@ def test_list_jobs(client, mocker):
     assert response.json()[0]["job_id"] == "1"
 
 
-def test_pause_job(client):
-    job_id = "dummy"
-    response = client.post(f"/jobs/{job_id}/pause")
+def test_signal_job_resumes(client, mocker):
+    mock_db = MagicMock()
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
+    mocker.patch("api.jobs.deliver_signal", return_value="resumed")
+    resume = mocker.patch("api.jobs._resume_signalled_job")
+
+    response = client.post("/jobs/job-1/signal", json={"payload": {"ok": True}})
+
+    assert response.status_code == 200
+    assert response.json() == {"job_id": "job-1", "status": "RESUMED"}
+    resume.assert_called_once_with(mock_db, "job-1")
+
+
+def test_signal_job_buffered(client, mocker):
+    mocker.patch("db.session.SessionLocal", return_value=MagicMock())
+    mocker.patch("api.jobs.deliver_signal", return_value="buffered")
+
+    response = client.post("/jobs/job-1/signal", json={"payload": {}})
+
+    assert response.status_code == 202
+    assert response.json()["status"] == "BUFFERED"
+
+
+def test_signal_job_not_waiting(client, mocker):
+    mock_db = MagicMock()
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
+    mocker.patch("api.jobs.deliver_signal", return_value=None)
+    mock_db.query.return_value.filter.return_value.first.return_value = Job(
+        id="job-1", workflow_name="wf", status="COMPLETED"
+    )
+
+    response = client.post("/jobs/job-1/signal", json={"payload": {}})
+
+    assert response.status_code == 409
+
+
+def test_signal_by_correlation_key(client, mocker):
+    mock_db = MagicMock()
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
+    mock_db.query.return_value.filter.return_value = [("job-1",), ("job-2",)]
+    mocker.patch("api.jobs.deliver_signal", side_effect=["resumed", None])
+    resume = mocker.patch("api.jobs._resume_signalled_job")
+
+    response = client.post("/signals/T-1", json={"payload": {"ok": True}})
+
+    assert response.status_code == 200
+    assert response.json() == {"resumed": ["job-1"]}
+    resume.assert_called_once_with(mock_db, "job-1")
+
+
+def test_pause_job(client, mocker):
+    mocker.patch("db.session.SessionLocal", return_value=MagicMock())
+    mocker.patch("api.jobs.stop_job", return_value="stopped")
+
+    response = client.post("/jobs/job-1/pause")
     assert response.status_code == 200
-    assert "Pause" in response.json()["message"]
+    assert response.json() == {"job_id": "job-1", "status": "PAUSED"}
+
+
+def test_pause_running_job_is_accepted(client, mocker):
+    mocker.patch("db.session.SessionLocal", return_value=MagicMock())
+    stop_job = mocker.patch("api.jobs.stop_job", return_value="stopping")
+
+    response = client.post("/jobs/job-1/cancel")
+    assert response.status_code == 202
+    assert response.json()["status"] == "CANCELLING"
+    assert stop_job.call_args.args[1:] == ("job-1", "CANCELLED")
+
+
+def test_pause_finished_job_conflict(client, mocker):
+    mock_job = Job(id="job-1", workflow_name="wf", status="COMPLETED", context={})
+    mock_db = MagicMock()
+    mock_db.query.return_value.filter.return_value.first.return_value = mock_job
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
+    mocker.patch("api.jobs.stop_job", return_value=None)
+
+    response = client.post("/jobs/job-1/pause")
+    assert response.status_code == 409
+
+
+def test_get_job_status_long_poll_finished_job(client, mocker):
+    mock_job = Job(id="job-1", workflow_name="TestFlow", status="COMPLETED", context={})
+    mock_db = MagicMock()
+    mock_db.query.return_value.filter.return_value.first.return_value = mock_job
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
+
+    response = client.get("/jobs/job-1?wait=30s")
+    assert response.status_code == 200
+    assert response.json()["status"] == "COMPLETED"
+
+
+def test_get_job_status_invalid_wait(client):
+    response = client.get("/jobs/job-1?wait=soon")
+    assert response.status_code == 422
+
+
+def test_stream_job_events_not_found(client, mocker):
+    mock_db = MagicMock()
+    mock_db.query.return_value.filter.return_value.first.return_value = None
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
+
+    response = client.get("/jobs/missing/events")
+    assert response.status_code == 404
@@ -0,0 +1,69 @@
+from unittest.mock import MagicMock
+
+from fastapi.testclient import TestClient
+
+from api.schedules import router
+from db.models import Schedule
+from main import app
+
+app.include_router(router)
+client = TestClient(app)
+
+
+def schedule_data(**overrides):
+    data = {
+        "name": "nightly",
+        "workflow_name": "Report",
+        "steps": [{"id": "wait", "type": "wait", "duration": "1"}],
+        "cron": "0 2 * * *",
+    }
+    data.update(overrides)
+    return data
+
+
+def test_create_schedule(mocker):
+    mock_db = MagicMock()
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
+    mock_db.query.return_value.filter.return_value.first.return_value = None
+    mock_db.query.return_value.filter.return_value.all.return_value = []
+
+    response = client.post("/schedules", json=schedule_data())
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["name"] == "nightly"
+    assert "T02:00:00" in body["next_fire_at"]
+    mock_db.commit.assert_called_once()
+
+
+def test_create_schedule_invalid(mocker):
+    mock_db = MagicMock()
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
+    mock_db.query.return_value.filter.return_value.first.return_value = None
+
+    response = client.post("/schedules", json=schedule_data(cron="0 25 * * *"))
+    assert response.status_code == 422
+
+    response = client.post("/schedules", json=schedule_data(interval_seconds=60))
+    assert response.status_code == 422
+    assert "Exactly one" in response.json()["detail"][0]
+
+
+def test_create_schedule_conflict(mocker):
+    mock_db = MagicMock()
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
+    mock_db.query.return_value.filter.return_value.first.return_value = Schedule(
+        name="nightly"
+    )
+
+    response = client.post("/schedules", json=schedule_data())
+    assert response.status_code == 409
+
+
+def test_get_schedule_not_found(mocker):
+    mock_db = MagicMock()
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
+    mock_db.query.return_value.filter.return_value.first.return_value = None
+
+    response = client.get("/schedules/missing")
+    assert response.status_code == 404
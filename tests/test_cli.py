@@ -0,0 +1,50 @@
+import os
+from unittest.mock import AsyncMock
+
+import pytest
+
+import cli
+
+
+def test_resumer_role_runs_one_sweep_without_schema_setup(mocker):
+    sweep = mocker.patch("core.job_resumer.main", new=AsyncMock())
+    init_db = mocker.patch("db.init_db.init_db")
+
+    cli.main(["resumer"])
+
+    sweep.assert_awaited_once()
+    init_db.assert_not_called()
+
+
+def test_worker_role_sets_up_schema(mocker):
+    run_worker = mocker.patch("core.worker.run_worker", new=AsyncMock())
+    init_db = mocker.patch("db.init_db.init_db")
+
+    cli.main(["worker"])
+
+    init_db.assert_called_once()
+    run_worker.assert_awaited_once()
+
+
+def test_simulate_role_uses_scratch_database(mocker, tmp_path, monkeypatch, capsys):
+    monkeypatch.delenv("KARYA_DATABASE_URL", raising=False)
+    workflow = tmp_path / "workflow.json"
+    workflow.write_text('{"workflow_name": "wf", "steps": []}')
+    report = mocker.MagicMock()
+    report.to_dict.return_value = {"jobs": 3}
+    simulate = mocker.patch(
+        "core.simulation.simulate", new=AsyncMock(return_value=report)
+    )
+    mocker.patch("db.init_db.init_db")
+
+    cli.main(["simulate", str(workflow), "--jobs", "3"])
+
+    assert "karya-sim-" in os.environ["KARYA_DATABASE_URL"]
+    simulate.assert_awaited_once()
+    assert simulate.await_args.kwargs["jobs"] == 3
+    assert '"jobs": 3' in capsys.readouterr().out
+
+
+def test_unknown_role_is_rejected():
+    with pytest.raises(SystemExit):
+        cli.main(["scheduler"])
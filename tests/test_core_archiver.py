@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, UTC
+
+import pytest
+
+from core import archiver
+from db import init_db
+from db.models import ArchivedJob, Job
+
+NOW = datetime(2026, 3, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+def session_targets():
+    return ("core.archiver.SessionLocal",)
+
+
+@pytest.fixture
+def session_factory(session_factory, memory_engine, mocker):
+    mocker.patch("core.archiver.engine", memory_engine)
+    return session_factory
+
+
+def add_job(session, job_id, workflow_name, status, age_days):
+    finished = NOW - timedelta(days=age_days)
+    session.add(
+        Job(
+            id=job_id,
+            workflow_name=workflow_name,
+            status=status,
+            context={"context": {"n": 1}, "output": {"big": "x" * 5000}},
+            steps=[{"id": "a", "type": "task", "action": "A"}],
+            created_at=finished,
+            updated_at=finished,
+        )
+    )
+
+
+def test_archive_finished_jobs_respects_retention(session_factory, mocker):
+    mocker.patch("core.archiver.config.RETENTION_DAYS", 30)
+    mocker.patch("core.archiver.config.WORKFLOW_RETENTION_DAYS", {"Short": 1})
+    session = session_factory()
+    add_job(session, "old-done", "Default", "COMPLETED", 40)
+    add_job(session, "old-failed", "Default", "FAILED", 40)
+    add_job(session, "old-running", "Default", "RUNNING", 40)
+    add_job(session, "recent-done", "Default", "COMPLETED", 5)
+    add_job(session, "short-done", "Short", "COMPLETED", 5)
+    session.commit()
+
+    archived = archiver.archive_finished_jobs(now=NOW, batch_size=1)
+
+    assert archived == 3
+    assert {job.id for job in session.query(Job).all()} == {
+        "old-running",
+        "recent-done",
+    }
+    record = session.query(ArchivedJob).filter(ArchivedJob.id == "short-done").one()
+    assert record.archived_on == "2026-02-24"
+    loaded = archiver.load_archived_job(record)
+    assert loaded["status"] == "COMPLETED"
+    assert loaded["context"]["output"]["big"] == "x" * 5000
+    assert len(record.payload) < 500
+
+
+def test_compact_database_on_sqlite(session_factory):
+    engine = archiver.engine
+
+    def pragma(name):
+        with engine.connect() as connection:
+            return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+    init_db.enable_incremental_vacuum(engine)
+    assert pragma("auto_vacuum") == 2  # INCREMENTAL
+
+    session = session_factory()
+    for i in range(20):
+        add_job(session, f"job-{i}", "Default", "COMPLETED", 40)
+    session.commit()
+    session.query(Job).delete()
+    session.commit()
+    session.close()
+    freed = pragma("freelist_count")
+    assert freed > 0
+
+    archiver.compact_database(pages=5)
+    assert pragma("freelist_count") == freed - 5
+    archiver.compact_database()
+    assert pragma("freelist_count") == 0
@@ -0,0 +1,32 @@
+import pytest
+
+from core import codec
+from core.codec import _OrjsonCodec, _StdlibCodec, _select, orjson
+
+CODECS = [_StdlibCodec] + ([_OrjsonCodec] if orjson else [])
+
+
+@pytest.mark.parametrize("impl", CODECS, ids=lambda c: c.name)
+def test_codecs_agree(impl):
+    value = {"b": [1, 2.5, None, True], "a": {"nested": "ü"}}
+
+    assert impl.loads(impl.dumps(value)) == value
+    assert impl.loads(impl.dumps({3: "x"})) == {"3": "x"}
+    assert impl.loads(impl.dumpb(value)) == impl.loads(impl.dumps(value))
+    assert impl.dumps({"b": 1, "a": 2}, sort_keys=True) == '{"a":2,"b":1}'
+    assert impl.dumpb({"b": 1, "a": 2}, sort_keys=True) == b'{"a":2,"b":1}'
+
+
+def test_select_falls_back_to_stdlib(mocker):
+    assert _select("json") is _StdlibCodec
+    mocker.patch("core.codec.orjson", None)
+    assert _select("orjson") is _StdlibCodec
+    assert _select("auto") is _StdlibCodec
+
+
+def test_engine_uses_codec():
+    from db.session import create_db_engine
+
+    engine = create_db_engine("sqlite://")
+    assert engine.dialect._json_serializer is codec.dumps
+    assert engine.dialect._json_deserializer is codec.loads
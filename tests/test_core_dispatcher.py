@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from core.dispatcher import JobDispatcher
+from core.executor import ACTIVE_JOBS
+
+
+def _job(order, job_id, gate=None):
+    async def run():
+        order.append(job_id)
+        if gate:
+            await gate.wait()
+        return job_id
+
+    return run
+
+
+@pytest.mark.asyncio
+async def test_bulk_workflow_does_not_starve_others():
+    dispatcher = JobDispatcher(concurrency=1)
+    order, gate = [], asyncio.Event()
+    runs = [dispatcher.submit("blocker", "bulk", _job(order, "blocker", gate))]
+    runs += [
+        dispatcher.submit(f"bulk-{i}", "bulk", _job(order, f"bulk-{i}"))
+        for i in range(5)
+    ]
+    runs += [
+        dispatcher.submit(f"fast-{i}", "fast", _job(order, f"fast-{i}"))
+        for i in range(2)
+    ]
+    gate.set()
+    await asyncio.gather(*runs)
+
+    assert order[:5] == ["blocker", "fast-0", "bulk-0", "fast-1", "bulk-1"]
+
+
+@pytest.mark.asyncio
+async def test_weights_and_priority():
+    dispatcher = JobDispatcher(concurrency=1, weights={"heavy": 2})
+    order, gate = [], asyncio.Event()
+    runs = [dispatcher.submit("blocker", "light", _job(order, "blocker", gate))]
+    runs += [
+        dispatcher.submit(f"heavy-{i}", "heavy", _job(order, f"heavy-{i}"))
+        for i in range(4)
+    ]
+    runs += [dispatcher.submit("light-low", "light", _job(order, "light-low"))]
+    runs += [
+        dispatcher.submit("light-high", "light", _job(order, "light-high"), priority=5)
+    ]
+    gate.set()
+    await asyncio.gather(*runs)
+
+    # heavy gets two turns per light turn; priority reorders within "light"
+    assert order[1:] == [
+        "heavy-0",
+        "heavy-1",
+        "light-high",
+        "heavy-2",
+        "heavy-3",
+        "light-low",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_and_metrics():
+    dispatcher = JobDispatcher(concurrency=2)
+    order, gate = [], asyncio.Event()
+    runs = [
+        dispatcher.submit(f"job-{i}", "wf", _job(order, f"job-{i}", gate))
+        for i in range(5)
+    ]
+    await asyncio.sleep(0)
+
+    assert dispatcher.running == 2
+    assert dispatcher.snapshot()["queues"]["wf"]["queued"] == 3
+    assert {f"job-{i}" for i in range(5)} <= ACTIVE_JOBS
+
+    gate.set()
+    assert await asyncio.gather(*runs) == [f"job-{i}" for i in range(5)]
+    stats = dispatcher.snapshot()["queues"]["wf"]
+    assert stats["dispatched"] == 5 and stats["queued"] == 0
+    assert stats["wait_seconds_max"] >= stats["wait_seconds_avg"] >= 0
+    assert not {f"job-{i}" for i in range(5)} & ACTIVE_JOBS
+
+
+@pytest.mark.asyncio
+async def test_cancel_drops_queued_job():
+    dispatcher = JobDispatcher(concurrency=1)
+    order, gate = [], asyncio.Event()
+    blocker = dispatcher.submit("blocker", "wf", _job(order, "blocker", gate))
+    queued = dispatcher.submit("queued", "wf", _job(order, "queued"))
+
+    assert dispatcher.cancel("queued")
+    assert not dispatcher.cancel("blocker")  # Already running
+    assert "queued" not in ACTIVE_JOBS
+    assert await queued is None
+    gate.set()
+    await blocker
+    assert order == ["blocker"]
@@ -0,0 +1,126 @@
+import asyncio
+import json
+
+import pytest
+
+from api.jobs import _job_event_stream, get_job_status
+from core.events import JobEventBus, job_events, status_event, step_event
+from db.models import Job
+
+
+@pytest.fixture
+def session_factory(session_factory):
+    session = session_factory()
+    session.add(Job(id="job-1", workflow_name="wf", status="RUNNING", context={}))
+    session.commit()
+    session.close()
+    return session_factory
+
+
+def _set_status(factory, status):
+    session = factory()
+    session.get(Job, "job-1").status = status
+    session.commit()
+    session.close()
+
+
+@pytest.mark.asyncio
+async def test_publish_fans_out_to_every_subscriber():
+    bus = JobEventBus()
+    with bus.subscribe("job-1") as first, bus.subscribe("job-1") as second:
+        bus.publish("job-1", step_event("job-1", "a", "task"))
+        bus.publish("job-2", step_event("job-2", "b", "task"))
+        assert first.get_nowait()["step"] == "a"
+        assert second.get_nowait()["step"] == "a"
+        assert first.empty() and second.empty()
+    assert bus.subscriber_count("job-1") == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_drops_oldest_events():
+    bus = JobEventBus(max_queued=2)
+    with bus.subscribe("job-1") as queue:
+        for step in ("a", "b", "c"):
+            bus.publish("job-1", step_event("job-1", step, "task"))
+        assert [queue.get_nowait()["step"] for _ in range(2)] == ["b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_long_poll_returns_on_status_change(session_factory):
+    async def finish():
+        await asyncio.sleep(0.05)
+        _set_status(session_factory, "COMPLETED")
+        job_events.publish("job-1", step_event("job-1", "a", "task"))
+        job_events.publish("job-1", status_event("job-1", "COMPLETED", "a"))
+
+    db = session_factory()
+    started = asyncio.get_running_loop().time()
+    result, _ = await asyncio.gather(
+        get_job_status("job-1", wait="5s", db=db), finish()
+    )
+    db.close()
+
+    assert result.status == "COMPLETED"
+    assert asyncio.get_running_loop().time() - started < 2
+
+
+@pytest.mark.asyncio
+async def test_long_poll_times_out_with_current_status(session_factory):
+    db = session_factory()
+    result = await get_job_status("job-1", wait="50ms", db=db)
+    db.close()
+    assert result.status == "RUNNING"
+
+
+@pytest.mark.asyncio
+async def test_event_stream_ends_at_terminal_status(session_factory):
+    async def finish():
+        await asyncio.sleep(0.05)
+        job_events.publish("job-1", step_event("job-1", "a", "task"))
+        job_events.publish("job-1", status_event("job-1", "COMPLETED", "a"))
+
+    async def collect():
+        return [chunk async for chunk in _job_event_stream("job-1")]
+
+    chunks, _ = await asyncio.gather(collect(), finish())
+
+    events = [json.loads(chunk.split("data: ", 1)[1]) for chunk in chunks]
+    assert [(e["type"], e.get("status")) for e in events] == [
+        ("status", "RUNNING"),
+        ("step", None),
+        ("status", "COMPLETED"),
+    ]
+    assert chunks[0].startswith("event: status\n")
+    assert job_events.subscriber_count("job-1") == 0
+
+
+@pytest.mark.asyncio
+async def test_event_stream_sees_changes_made_elsewhere(session_factory, mocker):
+    mocker.patch("config.SSE_KEEPALIVE_SECONDS", 0.02)
+
+    async def finish_elsewhere():
+        await asyncio.sleep(0.05)
+        _set_status(session_factory, "COMPLETED")  # Nothing published here
+
+    async def collect():
+        return [chunk async for chunk in _job_event_stream("job-1")]
+
+    chunks, _ = await asyncio.gather(collect(), finish_elsewhere())
+
+    events = [json.loads(c.split("data: ", 1)[1]) for c in chunks if "data: " in c]
+    assert [e["status"] for e in events] == ["RUNNING", "COMPLETED"]
+    assert ": keepalive\n\n" in chunks
+
+
+@pytest.mark.asyncio
+async def test_stopping_a_parked_job_publishes(session_factory):
+    from core import job_control
+
+    _set_status(session_factory, "WAITING")
+    db = session_factory()
+    with job_events.subscribe("job-1") as queue:
+        assert job_control.stop_job(db, "job-1", "CANCELLED") == "stopped"
+        event = queue.get_nowait()
+    db.close()
+
+    assert (event["status"], event["message"]) == ("CANCELLED", "Cancelled by request")
@@ -1,5 +1,6 @@
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 
 from core.executor import FlowExecutor
@@ -54,18 +55,20 @@ async def test_execute_task_step(sample_steps, parameters):
 async def test_execute_wait_step_within_retries(sample_steps, parameters):
     executor = FlowExecutor(sample_steps, parameters, "job-2")
 
-    with patch.object(executor, "session") as mock_session, patch.object(
+    with patch("core.executor.state_writer") as mock_writer, patch.object(
         executor, "update_job_status"
     ) as mock_update:
 
-        mock_job = MagicMock()
-        mock_session.query().get.return_value = mock_job
+        mock_writer.write = AsyncMock(return_value=None)
 
         result = await executor.run_step(sample_steps[1])
 
         assert result is "job_paused"
-        assert mock_job.status == "WAITING"
-        mock_session.commit.assert_called_once()
+        mock_writer.write.assert_awaited_once()
+        job_id, values = mock_writer.write.await_args.args
+        assert job_id == "job-2"
+        assert values["status"] == "WAITING"
+        assert values["current_step_id"] == "step2"
 
 
 @pytest.mark.asyncio
@@ -106,6 +109,41 @@ async def test_execute_steps_flow_success(sample_steps, parameters):
         mock_update.assert_called_with("COMPLETED")
 
 
+@pytest.mark.asyncio
+async def test_execute_steps_from_restored_checkpoint(sample_steps, parameters):
+    executor = FlowExecutor(sample_steps, parameters, "job-7")
+    executor.restore_checkpoint({"output": {"step1": {"ok": True}}}, 3)
+
+    with patch.object(
+        executor, "run_step", new=AsyncMock(return_value="http_completed")
+    ) as mock_run_step, patch.object(executor, "update_job_status") as mock_update:
+
+        result = await executor.execute_steps()
+        assert result == "completed"
+        mock_run_step.assert_awaited_once()
+        assert mock_run_step.await_args.args[0]["id"] == "end"
+        assert executor.context["output"] == {"step1": {"ok": True}}
+        mock_update.assert_called_with("COMPLETED")
+
+
+@pytest.mark.asyncio
+async def test_execute_steps_parks_on_signal(parameters):
+    steps = [
+        {"id": "approval", "type": "wait_for_signal", "correlation_key": "k-1"},
+        {"id": "done", "type": "task", "action": "MockAction"},
+    ]
+    executor = FlowExecutor(steps, parameters, "job-8")
+
+    with patch(
+        "core.executor.signals.park_job", return_value="AWAITING_SIGNAL"
+    ) as mock_park, patch.object(executor, "update_job_status") as mock_update:
+
+        result = await executor.execute_steps()
+        assert result == "paused"
+        assert mock_park.call_args.args[3] == "k-1"
+        mock_update.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_run_failure_logs_and_updates(sample_steps, parameters):
     executor = FlowExecutor(sample_steps, parameters, "job-6")
@@ -116,3 +154,47 @@ async def test_run_failure_logs_and_updates(sample_steps, parameters):
 
         await executor.run()
         mock_update.assert_called_with("FAILED", "fail")
+
+
+def _mock_downstream(payload: bytes):
+    return httpx.MockTransport(lambda request: httpx.Response(200, content=payload))
+
+
+@pytest.mark.asyncio
+async def test_execute_http_saves_projection(sample_steps, parameters):
+    executor = FlowExecutor(sample_steps, parameters, "job-5")
+    payload = b'{"status": "Done", "fields": {"big": "x", "id": 7}, "items": [{"id": 1, "v": 2}]}'
+    action = {
+        "method": "GET",
+        "url": "http://mock.url",
+        "save_as": "ticket",
+        "project": ["status", "fields.id", "items[*].id"],
+    }
+
+    with patch("core.executor.HTTP_TRANSPORT", _mock_downstream(payload)):
+        assert await executor.execute_http(action) == "http_completed"
+
+    assert executor.context["output"]["ticket"] == {
+        "status": "Done",
+        "fields": {"id": 7},
+        "items": [{"id": 1}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_execute_http_rejects_oversized_response(sample_steps, parameters):
+    executor = FlowExecutor(sample_steps, parameters, "job-6")
+    action = {
+        "method": "GET",
+        "url": "http://mock.url",
+        "save_as": "blob",
+        "max_response_bytes": 16,
+    }
+
+    with patch(
+        "core.executor.HTTP_TRANSPORT",
+        _mock_downstream(b'{"data": "' + b"x" * 64 + b'"}'),
+    ):
+        with pytest.raises(ValueError, match="16 byte limit"):
+            await executor.execute_http(action)
+    assert "blob" not in executor.context.get("output", {})
@@ -0,0 +1,45 @@
+import pytest
+from jinja2 import TemplateSyntaxError
+
+from core.expressions import (compile_condition, evaluate_condition,
+                              validate_conditions)
+
+
+def test_evaluate_condition_returns_bool():
+    context = {"output": {"check": {"status": "Done"}}}
+    assert evaluate_condition("output.check.status == 'Done'", context) is True
+    assert evaluate_condition("output.check.status == 'Open'", context) is False
+
+
+def test_compile_condition_is_cached():
+    assert compile_condition("context.value > 1") is compile_condition(
+        "context.value > 1"
+    )
+
+
+def test_compile_condition_syntax_error():
+    with pytest.raises(TemplateSyntaxError):
+        compile_condition("context.value ==")
+
+
+def test_evaluate_condition_is_sandboxed():
+    with pytest.raises(Exception):
+        evaluate_condition("context.__class__.__subclasses__()", {"context": {}})
+
+
+def test_validate_conditions():
+    steps = [
+        {"id": "t", "type": "task", "action": "A"},
+        {
+            "id": "c",
+            "type": "choice",
+            "conditions": [
+                {"if": "context.value ==", "next": "t"},
+                {"if": "context.value == 1", "next": "t"},
+                {"default": "t"},
+            ],
+        },
+    ]
+    errors = validate_conditions(steps)
+    assert len(errors) == 1
+    assert "Step 'c'" in errors[0]
@@ -0,0 +1,228 @@
+import asyncio
+from datetime import datetime, UTC
+
+import httpx
+import pytest
+
+from core import executor, job_control
+from core.executor import RUNNING_EXECUTORS, FlowExecutor
+from core.writer import StateWriter
+from db.models import Action, Job
+
+STEPS = [
+    {"id": "first", "type": "task", "action": "Call"},
+    {"id": "second", "type": "task", "action": "Call"},
+]
+
+
+@pytest.fixture
+def session_factory(session_factory):
+    session = session_factory()
+    session.add(
+        Action(
+            name="Call",
+            type="http",
+            config={"method": "GET", "url": "http://svc.mock/", "save_as": "call"},
+        )
+    )
+    session.commit()
+    session.close()
+    return session_factory
+
+
+@pytest.fixture
+def writer(mocker):
+    writer = StateWriter(flush_interval_ms=1)
+    mocker.patch("core.executor.state_writer", writer)
+    return writer
+
+
+def add_job(factory, job_id, status="SCHEDULED", **fields):
+    session = factory()
+    session.add(
+        Job(
+            id=job_id,
+            workflow_name="wf",
+            status=status,
+            context={},
+            steps=STEPS,
+            **fields,
+        )
+    )
+    session.commit()
+    session.close()
+
+
+def get_job(factory, job_id):
+    session = factory()
+    job = session.get(Job, job_id)
+    session.close()
+    return job
+
+
+@pytest.mark.asyncio
+async def test_pause_cancels_in_flight_call_and_resumes_there(
+    session_factory, writer, mocker
+):
+    calls, release = [], asyncio.Event()
+
+    async def downstream(request):
+        calls.append(request)
+        if len(calls) == 2:
+            await release.wait()  # The second step hangs until paused
+        return httpx.Response(200, json={"n": len(calls)})
+
+    mocker.patch("core.executor.HTTP_TRANSPORT", httpx.MockTransport(downstream))
+    add_job(session_factory, "job-1")
+    run = asyncio.create_task(FlowExecutor(STEPS, {}, "job-1").run())
+    while len(calls) < 2:
+        await asyncio.sleep(0.01)
+
+    session = session_factory()
+    assert job_control.stop_job(session, "job-1", "PAUSED") == "stopping"
+    session.close()
+    await run
+
+    job = get_job(session_factory, "job-1")
+    assert job.status == "PAUSED"
+    assert job.context["meta"]["resume_step"] == "second"
+    assert "job-1" not in RUNNING_EXECUTORS
+
+    release.set()
+    session = session_factory()
+    assert job_control.resume_paused_job(session, "job-1") == "RUNNING"
+    session.close()
+    while get_job(session_factory, "job-1").status != "COMPLETED":
+        await asyncio.sleep(0.01)
+    # Only the abandoned step ran again
+    assert len(calls) == 3
+    assert get_job(session_factory, "job-1").context["output"]["call"] == {"n": 3}
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_stop_takes_effect_between_steps(session_factory, writer, mocker):
+    mocker.patch(
+        "core.executor.HTTP_TRANSPORT",
+        httpx.MockTransport(lambda request: httpx.Response(200, json={})),
+    )
+    add_job(session_factory, "job-1")
+    flow = FlowExecutor(STEPS, {}, "job-1")
+    flow.request_stop("CANCELLED")  # Not in a call: nothing to interrupt
+
+    await flow.run()
+    await writer.close()
+
+    job = get_job(session_factory, "job-1")
+    assert job.status == "CANCELLED"
+    assert job.message == "Cancelled at step 'first'"
+
+
+def test_pause_parked_job_keeps_its_wait(session_factory):
+    resume_at = datetime(2026, 3, 2, 12, 0, tzinfo=UTC)
+    add_job(session_factory, "job-1", status="WAITING", resume_at=resume_at)
+    session = session_factory()
+
+    assert job_control.stop_job(session, "job-1", "PAUSED") == "stopped"
+    assert job_control.stop_job(session, "job-1", "PAUSED") is None
+    assert job_control.resume_paused_job(session, "job-1") == "WAITING"
+    session.close()
+
+    job = get_job(session_factory, "job-1")
+    assert job.status == "WAITING"
+    assert job.resume_at.replace(tzinfo=UTC) == resume_at
+    assert "paused_from" not in job.context["meta"]
+
+
+@pytest.mark.asyncio
+async def test_pause_and_resume_queued_job_keeps_its_parameters(
+    session_factory, mocker
+):
+    add_job(session_factory, "job-1")
+    session = session_factory()
+    session.get(Job, "job-1").context = {"x": 1}  # Never ran: raw parameters
+    session.commit()
+    mocker.patch("core.job_control.dispatcher.cancel", return_value=True)
+    submit = mocker.patch("core.job_control.dispatcher.submit")
+
+    assert job_control.stop_job(session, "job-1", "PAUSED") == "stopped"
+    session.expire_all()
+    assert session.get(Job, "job-1").context == {
+        "context": {"x": 1},
+        "meta": {"resume_step": "first"},
+    }
+
+    assert job_control.resume_paused_job(session, "job-1") == "RUNNING"
+    session.close()
+    run = submit.call_args.args[2]
+    assert run.__self__.context["context"] == {"x": 1}
+
+
+def test_heartbeat_stops_jobs_cancelled_elsewhere(session_factory, mocker):
+    add_job(session_factory, "job-1", status="CANCELLED")
+    add_job(session_factory, "job-2", status="PAUSING")
+    stop_local = mocker.patch("core.job_control.stop_local", return_value=True)
+    owned = {"job-1", "job-2", "deleted"}
+    executor.ACTIVE_JOBS.update(owned)
+    try:
+        from core.job_resumer import heartbeat_active_jobs
+
+        heartbeat_active_jobs()
+    finally:
+        executor.ACTIVE_JOBS.difference_update(owned)
+
+    stopped = sorted(call.args for call in stop_local.call_args_list)
+    assert stopped == [
+        ("deleted", "CANCELLED"),
+        ("job-1", "CANCELLED"),
+        ("job-2", "PAUSED"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pause_job_running_elsewhere_waits_for_its_owner(
+    session_factory, writer, mocker
+):
+    calls = []
+    mocker.patch(
+        "core.executor.HTTP_TRANSPORT",
+        httpx.MockTransport(
+            lambda request: calls.append(request) or httpx.Response(200, json={})
+        ),
+    )
+    add_job(session_factory, "job-1", status="RUNNING")
+    session = session_factory()
+
+    # No executor here: another process owns the job
+    assert job_control.stop_job(session, "job-1", "PAUSED") == "stopping"
+    assert get_job(session_factory, "job-1").status == "PAUSING"
+    assert job_control.resume_paused_job(session, "job-1") is None
+    session.close()
+
+    # The owner's status write runs into the request and checkpoints instead
+    await FlowExecutor(STEPS, {}, "job-1").run()
+    await writer.close()
+
+    job = get_job(session_factory, "job-1")
+    assert job.status == "PAUSED"
+    assert job.context["meta"]["resume_step"] == "first"
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_recovery_settles_stop_requests_left_by_a_dead_owner(
+    session_factory, mocker
+):
+    from core import job_resumer
+
+    mocker.patch("core.job_resumer.SessionLocal", session_factory)
+    stale = datetime(2020, 1, 1)
+    add_job(session_factory, "job-1", status="CANCELLING", updated_at=stale)
+    add_job(session_factory, "job-2", status="PAUSING", updated_at=stale)
+
+    assert await job_resumer.recover_orphaned_jobs() == 0
+
+    assert get_job(session_factory, "job-1").status == "CANCELLED"
+    job = get_job(session_factory, "job-2")
+    assert job.status == "PAUSED"
+    assert job.context["meta"]["resume_step"] == "first"
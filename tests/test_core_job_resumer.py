@@ -0,0 +1,142 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from core import job_resumer
+from core.executor import ACTIVE_JOBS
+from db.models import Job
+
+
+@pytest.fixture
+def orphan():
+    return Job(
+        id="orphan-1",
+        workflow_name="wf",
+        status="RUNNING",
+        current_step_id="fetch",
+        steps=[
+            {"id": "fetch", "type": "task", "action": "Fetch"},
+            {"id": "notify", "type": "task", "action": "Notify"},
+        ],
+        context={
+            "context": {"x": 1},
+            "meta": {"job_id": "orphan-1", "current_step": "fetch"},
+            "output": {"fetch": {"ok": True}},
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_recover_orphaned_jobs_resumes_from_checkpoint(orphan, mocker):
+    mock_db = MagicMock()
+    mocker.patch("core.job_resumer.SessionLocal", return_value=mock_db)
+    mock_db.query.return_value.filter.return_value.all.return_value = [orphan]
+    mock_db.query.return_value.filter.return_value.update.return_value = 1
+    executor = MagicMock(run=AsyncMock())
+    executor_cls = mocker.patch("core.job_resumer.FlowExecutor", return_value=executor)
+    submit = mocker.spy(job_resumer.dispatcher, "submit")
+
+    recovered = await job_resumer.recover_orphaned_jobs()
+
+    assert recovered == 1
+    executor.run.assert_not_awaited()  # The sweep doesn't wait for the job
+    await job_resumer.dispatcher.wait_idle()
+    # Through the fair dispatcher, not a private semaphore
+    submit.assert_called_once_with("orphan-1", "wf", executor.run, 0)
+    executor_cls.assert_called_once_with(
+        steps=orphan.steps, parameters={"x": 1}, job_id="orphan-1"
+    )
+    executor.restore_checkpoint.assert_called_once_with(orphan.context, 1)
+    executor.run.assert_awaited_once()
+    ACTIVE_JOBS.discard("orphan-1")
+
+
+@pytest.mark.asyncio
+async def test_recover_scheduled_orphan_keeps_its_parameters(mocker):
+    # Never ran: the context is still the raw request parameters
+    orphan = Job(
+        id="orphan-2",
+        workflow_name="wf",
+        status="SCHEDULED",
+        steps=[{"id": "fetch", "type": "task", "action": "Fetch"}],
+        context={"x": 1},
+    )
+    mock_db = MagicMock()
+    mocker.patch("core.job_resumer.SessionLocal", return_value=mock_db)
+    mock_db.query.return_value.filter.return_value.all.return_value = [orphan]
+    mock_db.query.return_value.filter.return_value.update.return_value = 1
+    executor = MagicMock(run=AsyncMock())
+    executor_cls = mocker.patch("core.job_resumer.FlowExecutor", return_value=executor)
+
+    assert await job_resumer.recover_orphaned_jobs() == 1
+    await job_resumer.dispatcher.wait_idle()
+
+    executor_cls.assert_called_once_with(
+        steps=orphan.steps, parameters={"x": 1}, job_id="orphan-2"
+    )
+    executor.restore_checkpoint.assert_called_once_with(orphan.context, 0)
+    ACTIVE_JOBS.discard("orphan-2")
+
+
+@pytest.mark.asyncio
+async def test_recover_orphaned_jobs_skips_jobs_claimed_elsewhere(orphan, mocker):
+    mock_db = MagicMock()
+    mocker.patch("core.job_resumer.SessionLocal", return_value=mock_db)
+    mock_db.query.return_value.filter.return_value.all.return_value = [orphan]
+    mock_db.query.return_value.filter.return_value.update.return_value = 0
+    executor_cls = mocker.patch("core.job_resumer.FlowExecutor")
+
+    recovered = await job_resumer.recover_orphaned_jobs()
+
+    assert recovered == 0
+    executor_cls.assert_not_called()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sweep", ["resume_due_jobs", "recover_orphaned_jobs"])
+async def test_sweeps_close_their_session_on_error(sweep, mocker):
+    mock_db = MagicMock()
+    mocker.patch("core.job_resumer.SessionLocal", return_value=mock_db)
+    mock_db.query.side_effect = RuntimeError("database is locked")
+
+    with pytest.raises(RuntimeError):
+        await getattr(job_resumer, sweep)()
+
+    mock_db.commit.assert_not_called()
+    mock_db.close.assert_called_once()
+
+
+def test_heartbeat_active_jobs(mocker):
+    mock_db = MagicMock()
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
+    ACTIVE_JOBS.add("live-1")
+    try:
+        job_resumer.heartbeat_active_jobs()
+    finally:
+        ACTIVE_JOBS.discard("live-1")
+
+    mock_db.query.return_value.filter.return_value.update.assert_called_once()
+    mock_db.commit.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_one_shot_run_heartbeats_until_its_jobs_finish(mocker):
+    mocker.patch("core.job_resumer.recover_orphaned_jobs", AsyncMock(return_value=0))
+    mocker.patch("core.job_resumer.resume_due_jobs", AsyncMock(return_value=1))
+    heartbeat = mocker.patch("core.job_resumer.heartbeat_active_jobs")
+    heartbeat_loop = job_resumer.heartbeat_loop
+    mocker.patch(
+        "core.job_resumer.heartbeat_loop", lambda interval: heartbeat_loop(0.01)
+    )
+
+    async def long_step():
+        await asyncio.sleep(0.1)
+
+    job_resumer.dispatcher.submit("long-1", "wf", long_step)
+    await job_resumer.main()
+
+    assert heartbeat.call_count > 1
+    calls = heartbeat.call_count
+    await asyncio.sleep(0.05)
+    assert heartbeat.call_count == calls  # Stopped with the run
@@ -1,7 +1,8 @@
 from unittest.mock import MagicMock
 
 from core.job_utils import (exceeded_max_retries, get_current_step,
-                            get_retry_count, increment_retry_count)
+                            get_parameters, get_resume_index, get_retry_count,
+                            increment_retry_count)
 
 
 def test_get_current_step():
@@ -63,3 +64,38 @@ def test_exceeded_max_retries_non_wait_type():
     mock_job.context = {"meta": {"current_step": "jira_check"}}
     mock_job.steps = [{"id": "jira_check", "type": "task", "action": "CheckJiraStatus"}]
     assert exceeded_max_retries(mock_job) is False
+
+
+def test_get_resume_index():
+    mock_job = MagicMock()
+    mock_job.status = "RUNNING"
+    mock_job.steps = [
+        {"id": "fetch", "type": "task", "action": "Fetch"},
+        {
+            "id": "decide",
+            "type": "choice",
+            "conditions": [{"if": "output.fetch", "next": "done"}, {"default": "wait"}],
+        },
+        {"id": "wait", "type": "wait", "duration": "5"},
+        {"id": "done", "type": "task", "action": "Notify"},
+    ]
+    mock_job.current_step_id = "fetch"
+    assert get_resume_index(mock_job) == 1
+    mock_job.current_step_id = "decide"
+    assert get_resume_index(mock_job) == 1
+    mock_job.current_step_id = "wait"
+    assert get_resume_index(mock_job) == 0
+    mock_job.current_step_id = "done"
+    assert get_resume_index(mock_job) == 4
+    mock_job.status = "SCHEDULED"
+    assert get_resume_index(mock_job) == 0
+
+
+def test_get_parameters_from_either_context_shape():
+    mock_job = MagicMock()
+    mock_job.context = {"x": 1}  # Never ran
+    assert get_parameters(mock_job) == {"x": 1}
+    mock_job.context = {"context": {"x": 1}, "meta": {"job_id": "j"}, "output": {}}
+    assert get_parameters(mock_job) == {"x": 1}
+    mock_job.context = None
+    assert get_parameters(mock_job) == {}
@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import pytest
+
+from core import profiling
+from core.profiling import LoopLagMonitor
+
+pytestmark = pytest.mark.asyncio
+
+
+def block_loop(seconds):
+    time.sleep(seconds)
+
+
+def spin(seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+async def profiled_step():
+    spin(0.3)
+
+
+async def test_loop_lag_monitor_captures_blocking_stack():
+    monitor = LoopLagMonitor(threshold_ms=50)
+    task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0.1)
+    block_loop(0.3)
+    await asyncio.sleep(0.1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    snapshot = monitor.snapshot()
+    assert snapshot["stalls_total"] == 1
+    stall = snapshot["recent_stalls"][0]
+    assert stall["lag_ms"] >= 200
+    assert "test_core_profiling.block_loop" in stall["stack"][-1]
+    assert not snapshot["enabled"]
+
+
+async def test_profile_keeps_only_target_frames():
+    targets = frozenset({profiled_step.__code__})
+
+    async def workload():
+        await asyncio.sleep(0.05)
+        spin(0.1)  # Outside the target: not kept
+        await profiled_step()
+
+    sampler, _ = await asyncio.gather(profiling.profile(0.6, targets), workload())
+
+    lines = sampler.collapsed().splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert stack.startswith("test_core_profiling.profiled_step")
+        assert int(count) > 0
+    assert any(line.startswith("test_core_profiling.profiled_step;") for line in lines)
+    assert sampler.samples_total > sum(sampler.counts.values())
+
+
+async def test_one_profile_at_a_time():
+    first = asyncio.create_task(profiling.profile(0.2, frozenset()))
+    await asyncio.sleep(0)
+    with pytest.raises(RuntimeError):
+        await profiling.profile(0.1, frozenset())
+    await first
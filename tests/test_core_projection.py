@@ -0,0 +1,39 @@
+import pytest
+
+from core.projection import compile_path, project
+
+RESPONSE = {
+    "key": "ABC-1",
+    "fields": {"status": {"name": "Done"}, "description": "long text"},
+    "comments": [{"id": 1, "body": "a"}, {"id": 2, "body": "b"}],
+}
+
+
+def test_jsonpath_projection():
+    assert project(RESPONSE, "$.fields.status.name") == "Done"
+    assert project(RESPONSE, "$.comments[*].id") == [1, 2]
+    assert project(RESPONSE, "$.comments[-1]") == {"id": 2, "body": "b"}
+    assert project(RESPONSE, "$['key']") == "ABC-1"
+    assert project(RESPONSE, "$.missing") is None
+
+
+def test_field_list_keeps_nesting():
+    projected = project(RESPONSE, ["key", "fields.status.name", "comments[*].id"])
+    assert projected == {
+        "key": "ABC-1",
+        "fields": {"status": {"name": "Done"}},
+        "comments": [{"id": 1}, {"id": 2}],
+    }
+    assert project(RESPONSE, ["nope.x"]) == {}
+    assert project(RESPONSE, None) is RESPONSE
+
+
+@pytest.mark.parametrize("path", ["$items", "a b", "a[0]b", "$."])
+def test_invalid_paths(path):
+    with pytest.raises(ValueError):
+        compile_path(path)
+
+
+def test_field_list_rejects_indexes():
+    with pytest.raises(ValueError):
+        project(RESPONSE, ["comments[0].id"])
@@ -0,0 +1,123 @@
+import asyncio
+import os
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from core import python_actions
+from core.executor import FlowExecutor
+from core.python_actions import python_action
+
+pytestmark = pytest.mark.asyncio
+
+
+# Module level so the pool's worker processes can import them
+@python_action("test.word_count")
+def word_count(inputs):
+    return {"words": len(inputs["text"].split()), "pid": os.getpid()}
+
+
+@python_action("test.sleep")
+def sleep(inputs):
+    time.sleep(inputs["seconds"])
+    return {}
+
+
+@python_action("test.crash")
+def crash(inputs):
+    os._exit(1)
+
+
+@pytest.fixture(autouse=True)
+def pool(mocker):
+    mocker.patch("config.PYTHON_ACTION_POOL_SIZE", 1)
+    yield
+    python_actions.shutdown()
+
+
+async def test_runs_in_worker_process():
+    result = await python_actions.run("test.word_count", {"text": "a b c"})
+
+    assert result["words"] == 3
+    assert result["pid"] != os.getpid()
+
+
+async def test_timeout_kills_only_that_call():
+    with pytest.raises(TimeoutError):
+        await python_actions.run("test.sleep", {"seconds": 30}, timeout=0.5)
+
+    assert not python_actions._workers  # The stuck worker was killed
+    result = await python_actions.run("test.word_count", {"text": "ok"}, timeout=30)
+    assert result["words"] == 1
+
+
+async def test_queued_call_waits_out_another_calls_timeout(mocker):
+    mocker.patch("config.PYTHON_ACTION_POOL_SIZE", 2)
+    slow = asyncio.create_task(
+        python_actions.run("test.sleep", {"seconds": 30}, timeout=2)
+    )
+    # Both slots busy: the third call queues behind them
+    running = asyncio.create_task(
+        python_actions.run("test.sleep", {"seconds": 3}, timeout=30)
+    )
+    await asyncio.sleep(0.1)
+    queued = asyncio.create_task(
+        python_actions.run("test.word_count", {"text": "a b"}, timeout=30)
+    )
+
+    with pytest.raises(TimeoutError):
+        await slow
+    # Neither the call running beside it nor the queued one is affected
+    assert await running == {}
+    assert (await queued)["words"] == 2
+
+
+async def test_dead_worker_fails_the_call_without_retrying():
+    with pytest.raises(RuntimeError, match="its worker died"):
+        await python_actions.run("test.crash", {})
+
+    result = await python_actions.run("test.word_count", {"text": "ok"})
+    assert result["words"] == 1
+
+
+async def test_function_errors_are_raised():
+    with pytest.raises(KeyError):
+        await python_actions.run("test.word_count", {})
+    assert len(python_actions._idle) == 1  # The worker is reused
+
+
+async def test_unknown_function():
+    with pytest.raises(ValueError, match="not registered"):
+        await python_actions.run("test.missing", {})
+
+
+async def test_executor_saves_rendered_result():
+    steps = [{"id": "count", "type": "task", "action": "Count"}]
+    executor = FlowExecutor(steps, {"title": "two words"}, "job-1")
+    action = {
+        "type": "python",
+        "function": "test.word_count",
+        "inputs": {"text": "{{ context.title | tojson }}"},
+        "save_as": "count",
+        "project": ["words"],
+    }
+
+    with patch.object(
+        executor, "load_action", new=AsyncMock(return_value=action)
+    ), patch.object(executor, "persist_context", new=AsyncMock()):
+        result = await executor.run_step(steps[0])
+
+    assert result == "python_completed"
+    assert executor.context["output"]["count"] == {"words": 2}
+
+
+async def test_executor_rejects_unknown_action_type():
+    steps = [{"id": "step", "type": "task", "action": "Legacy"}]
+    executor = FlowExecutor(steps, {}, "job-2")
+
+    with patch.object(
+        executor, "load_action", new=AsyncMock(return_value={"type": "lambda"})
+    ):
+        with pytest.raises(ValueError, match="Unsupported action type 'lambda'"):
+            await executor.run_step(steps[0])
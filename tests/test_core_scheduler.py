@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta, UTC
+
+import pytest
+
+from core import cron
+from core.scheduler import ScheduleRunner, acquire_lease, plan_fires
+from db.models import Job, Schedule
+
+NOW = datetime(2026, 3, 2, 12, 0, 30, tzinfo=UTC)
+STEPS = [{"id": "wait", "type": "wait", "duration": "1"}]
+
+
+def add_schedule(factory, name, next_fire_at, **fields):
+    session = factory()
+    session.add(
+        Schedule(
+            name=name,
+            workflow_name="wf",
+            steps=STEPS,
+            parameters={"x": 1},
+            next_fire_at=next_fire_at,
+            updated_at=NOW,
+            **fields,
+        )
+    )
+    session.commit()
+    session.close()
+
+
+def test_cron_next_after():
+    expr = cron.parse("30 9 * * mon-fri")
+    # Friday evening rolls over to Monday morning
+    assert expr.next_after(datetime(2026, 10, 23, 18, 0)) == datetime(
+        2026, 10, 26, 9, 30
+    )
+    assert cron.parse("@hourly").next_after(datetime(2026, 1, 1, 0, 0)) == datetime(
+        2026, 1, 1, 1, 0
+    )
+    # Both day fields restricted: either one matches
+    expr = cron.parse("0 0 13 * fri")
+    assert expr.next_after(datetime(2026, 2, 1)) == datetime(2026, 2, 6)
+
+
+@pytest.mark.parametrize(
+    "expr", ["* * *", "61 * * * *", "*/0 * * * *", "0 0 30 2 *", "0 0 * * funday"]
+)
+def test_cron_rejects_invalid_expressions(expr):
+    with pytest.raises(ValueError):
+        cron.parse(expr)
+
+
+@pytest.mark.parametrize(
+    "policy, expected",
+    [
+        ("skip", ["12:00"]),
+        ("fire_once", ["12:00"]),
+        ("catch_up", ["09:00", "10:00", "11:00", "12:00"]),
+    ],
+)
+def test_plan_fires_misfire_policies(policy, expected):
+    schedule = Schedule(cron="0 * * * *", misfire_policy=policy)
+    due = datetime(2026, 3, 2, 9, 0, tzinfo=UTC)
+
+    fires, next_at = plan_fires(schedule, due, NOW)
+
+    assert [f.strftime("%H:%M") for f in fires] == expected
+    assert next_at == datetime(2026, 3, 2, 13, 0, tzinfo=UTC)
+
+
+def test_plan_fires_fire_once_after_downtime():
+    schedule = Schedule(interval_seconds=3600, misfire_policy="fire_once")
+    due = NOW - timedelta(days=30, minutes=30)
+
+    fires, next_at = plan_fires(schedule, due, NOW)
+
+    assert fires == [NOW - timedelta(minutes=30)]  # The latest missed slot
+    assert NOW < next_at <= NOW + timedelta(hours=1)
+    skip_fires, _ = plan_fires(
+        Schedule(interval_seconds=3600, misfire_policy="skip"), due, NOW
+    )
+    assert skip_fires == []
+
+
+def test_runner_fires_due_schedules_only(session_factory):
+    add_schedule(session_factory, "due", NOW - timedelta(seconds=10), cron="* * * * *")
+    add_schedule(session_factory, "later", NOW + timedelta(hours=1), cron="0 * * * *")
+    add_schedule(
+        session_factory,
+        "off",
+        NOW - timedelta(seconds=10),
+        cron="* * * * *",
+        enabled=False,
+    )
+    runner = ScheduleRunner(holder="a")
+
+    jobs = runner.tick(NOW)
+
+    assert runner.is_leader
+    assert [job["parameters"] for job in jobs] == [{"x": 1}]
+    session = session_factory()
+    assert session.query(Job).one().message.startswith("Scheduled by 'due'")
+    due = session.get(Schedule, "due")
+    assert due.next_fire_at.replace(tzinfo=UTC) == datetime(
+        2026, 3, 2, 12, 1, tzinfo=UTC
+    )
+    session.close()
+    # Nothing new is due within the same minute
+    assert runner.tick(NOW + timedelta(seconds=10)) == []
+
+
+def test_only_the_lease_holder_fires(session_factory):
+    add_schedule(session_factory, "due", NOW - timedelta(seconds=10), cron="* * * * *")
+    leader, standby = ScheduleRunner(holder="a"), ScheduleRunner(holder="b")
+
+    assert len(leader.tick(NOW)) == 1
+    assert standby.tick(NOW + timedelta(minutes=1)) == []
+    assert not standby.is_leader
+
+
+def test_expired_lease_can_be_taken_over(session_factory):
+    session = session_factory()
+    assert acquire_lease(session, "a", ttl=-1)  # Already expired
+    assert acquire_lease(session, "b", ttl=30)
+    assert not acquire_lease(session, "a", ttl=30)
+    session.close()
@@ -0,0 +1,156 @@
+from datetime import datetime
+
+import pytest
+
+from core.signals import AWAITING_SIGNAL, deliver_signal, park_job
+from db.models import Job
+
+STEPS = [
+    {"id": "request", "type": "task", "action": "RequestApproval"},
+    {
+        "id": "approval",
+        "type": "wait_for_signal",
+        "correlation_key": "{{ context.ticket }}",
+        "save_as": "decision",
+    },
+    {"id": "done", "type": "task", "action": "Notify"},
+]
+
+
+@pytest.fixture
+def session_factory(session_factory):
+    session = session_factory()
+    session.add(Job(id="job-1", workflow_name="wf", status="RUNNING", steps=STEPS))
+    session.commit()
+    session.close()
+    return session_factory
+
+
+def test_park_then_deliver(session_factory):
+    context = {"context": {"ticket": "T-1"}, "meta": {"current_step": "approval"}}
+    assert park_job("job-1", context, STEPS[1], "T-1", None) == AWAITING_SIGNAL
+
+    session = session_factory()
+    job = session.get(Job, "job-1")
+    assert job.status == AWAITING_SIGNAL
+    assert job.correlation_key == "T-1"
+
+    assert deliver_signal(session, "job-1", {"approved": True}) == "resumed"
+    session.expire_all()
+    job = session.get(Job, "job-1")
+    assert job.status == "RUNNING"
+    assert job.correlation_key is None
+    assert job.context["output"]["decision"] == {"approved": True}
+
+    # Past its only signal step, nothing would consume another one
+    assert deliver_signal(session, "job-1", {"approved": False}) is None
+    session.expire_all()
+    assert session.get(Job, "job-1").signal_payload is None
+
+
+def test_signal_before_park_is_consumed(session_factory):
+    session = session_factory()
+    assert deliver_signal(session, "job-1", {"approved": True}) == "buffered"
+
+    context = {"context": {}, "meta": {"current_step": "approval"}}
+    assert park_job("job-1", context, STEPS[1], None, None) is None
+    assert context["output"]["decision"] == {"approved": True}
+
+    session.expire_all()
+    job = session.get(Job, "job-1")
+    assert job.status == "RUNNING"
+    assert job.signal_payload is None
+    assert job.current_step_id == "approval"
+
+
+def test_buffers_only_while_a_signal_step_is_ahead(session_factory):
+    session = session_factory()
+    job = session.get(Job, "job-1")
+    job.current_step_id = "request"
+    session.commit()
+    assert deliver_signal(session, "job-1", {"early": True}) == "buffered"
+    assert deliver_signal(session, "job-1", {"again": True}) is None
+
+    job = session.get(Job, "job-1")
+    job.signal_payload = None
+    job.current_step_id = "done"
+    session.commit()
+    assert deliver_signal(session, "job-1", {"late": True}) is None
+
+
+def test_waiting_and_paused_jobs_buffer_too(session_factory):
+    session = session_factory()
+    job = session.get(Job, "job-1")
+    job.status = "WAITING"  # Polls with wait steps until its signal step
+    session.commit()
+    assert deliver_signal(session, "job-1", {"early": True}) == "buffered"
+
+    job = session.get(Job, "job-1")
+    job.status, job.signal_payload = "PAUSED", None
+    job.context = {"context": {}, "meta": {"resume_step": "done"}}
+    session.commit()
+    assert deliver_signal(session, "job-1", {"late": True}) is None
+
+
+def test_signal_buffered_while_paused_on_signal_step(session_factory, mocker):
+    from core import job_control
+
+    submit = mocker.patch("core.job_control.dispatcher.submit")
+    session = session_factory()
+    job = session.get(Job, "job-1")
+    job.status, job.current_step_id = "PAUSED", "approval"
+    job.context = {
+        "context": {},
+        "meta": {"current_step": "approval", "paused_from": AWAITING_SIGNAL},
+    }
+    session.commit()
+
+    assert deliver_signal(session, "job-1", {"approved": True}) == "buffered"
+    assert job_control.resume_paused_job(session, "job-1") == "RUNNING"
+
+    session.expire_all()
+    job = session.get(Job, "job-1")
+    assert job.signal_payload is None
+    assert job.context["output"]["decision"] == {"approved": True}
+    run = submit.call_args.args[2]
+    assert run.__self__.start_index == 2  # Continues after the signal step
+    session.close()
+
+
+def test_deliver_without_buffering(session_factory):
+    session = session_factory()
+    assert deliver_signal(session, "job-1", {}, buffer=False) is None
+    assert deliver_signal(session, "missing", {}) is None
+
+
+@pytest.mark.asyncio
+async def test_signal_beats_timeout_sweep_that_read_before_it(session_factory, mocker):
+    from core import job_resumer, job_utils
+
+    mocker.patch("core.job_resumer.SessionLocal", session_factory)
+    session = session_factory()
+    job = session.get(Job, "job-1")
+    job.status = AWAITING_SIGNAL
+    job.current_step_id = "approval"
+    job.context = {"meta": {"current_step": "approval"}}
+    job.resume_at = datetime(2020, 1, 1)
+    session.commit()
+
+    get_current_step = job_utils.get_current_step
+
+    def signal_lands_first(job):
+        assert deliver_signal(session_factory(), "job-1", {"ok": True}) == "resumed"
+        return get_current_step(job)
+
+    mocker.patch(
+        "core.job_resumer.job_utils.get_current_step", side_effect=signal_lands_first
+    )
+    submit = mocker.patch("core.job_resumer.dispatcher.submit")
+
+    assert await job_resumer.resume_due_jobs() == 0
+
+    session.expire_all()
+    job = session.get(Job, "job-1")
+    assert job.status == "RUNNING"  # Not FAILED by the timed-out sweep
+    assert job.context["output"]["decision"] == {"ok": True}
+    submit.assert_not_called()
@@ -0,0 +1,96 @@
+import asyncio
+from datetime import datetime, timedelta, UTC
+
+import httpx
+import pytest
+
+from core import clock
+from core.clock import VirtualClock
+from core.simulation import simulate
+
+START = datetime(2026, 3, 2, 9, 0, tzinfo=UTC)
+
+REQUEST = {
+    "workflow_name": "Escalation",
+    "parameters": {"ticket_id": "ABC-123"},
+    "actions": [
+        {
+            "name": "CheckStatus",
+            "type": "http",
+            "config": {
+                "method": "GET",
+                "url": "http://tickets.mock/status",
+                "save_as": "check",
+            },
+        }
+    ],
+    "steps": [
+        {"id": "check", "type": "task", "action": "CheckStatus"},
+        {
+            "id": "decision",
+            "type": "choice",
+            "conditions": [
+                {"if": "output.check.status == 'Done'", "next": "done"},
+                {"default": "wait"},
+            ],
+        },
+        {"id": "wait", "type": "wait", "duration": "3600", "max_retries": 10},
+        {"id": "done", "type": "task", "action": "CheckStatus"},
+    ],
+}
+
+
+@pytest.fixture
+def session_targets():
+    return ("db.session.SessionLocal", "core.job_resumer.SessionLocal")
+
+
+def done_after(checks):
+    calls = {}
+
+    def handler(request):
+        calls[id(request)] = True
+        status = "Done" if len(calls) > checks else "Open"
+        return httpx.Response(200, json={"status": status})
+
+    return handler
+
+
+def test_virtual_clock_only_moves_forward():
+    virtual = VirtualClock(START)
+    with clock.use_clock(virtual):
+        assert clock.now() == START
+        asyncio.run(clock.sleep(30))
+        assert clock.now() == START + timedelta(seconds=30)
+        virtual.advance_to(START)  # Never goes back
+        assert clock.now() == START + timedelta(seconds=30)
+        virtual.advance_to(datetime(2026, 3, 2, 10, 0))  # Naive is UTC
+        assert clock.now() == datetime(2026, 3, 2, 10, 0, tzinfo=UTC)
+    assert clock.now() != virtual.now()
+
+
+@pytest.mark.asyncio
+async def test_simulate_replays_waits(session_factory):
+    report = await simulate(REQUEST, jobs=3, downstream=done_after(6), start=START)
+
+    assert report.statuses == {"COMPLETED": 3}
+    # Each job waits an hour after each "Open" answer
+    assert report.sweeps == 2
+    assert report.resumes == 6
+    assert report.virtual_seconds == 7200
+    assert report.wall_seconds < 60
+    assert clock.now() != START  # Real clock restored
+
+
+@pytest.mark.asyncio
+async def test_simulate_stops_at_horizon(session_factory):
+    report = await simulate(
+        REQUEST,
+        jobs=2,
+        horizon_seconds=3 * 3600,
+        downstream=done_after(1000),
+        start=START,
+    )
+
+    assert report.statuses == {"WAITING": 2}
+    assert report.virtual_seconds == 3 * 3600
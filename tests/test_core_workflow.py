@@ -0,0 +1,108 @@
+import pytest
+
+from core.workflow import WorkflowError, compile_workflow, get_plan
+
+
+@pytest.fixture
+def steps():
+    return [
+        {"id": "check", "type": "task", "action": "CheckStatus"},
+        {
+            "id": "decide",
+            "type": "choice",
+            "conditions": [
+                {"if": "output.check.status == 'Done'", "next": "done"},
+                {"default": "wait"},
+            ],
+        },
+        {"id": "wait", "type": "wait", "duration": "5", "max_retries": 3},
+        {"id": "done", "type": "task", "action": "Notify"},
+    ]
+
+
+def test_compile_workflow_builds_plan(steps):
+    plan = compile_workflow(steps)
+    assert plan.index == {"check": 0, "decide": 1, "wait": 2, "done": 3}
+    assert plan.successors == ((1,), (3, 2), (3,), ())
+    assert plan.action_names == {"CheckStatus", "Notify"}
+    assert plan.next_index(1, "wait") == 2
+    assert plan.next_index(3, None) == 4
+
+
+def test_plan_is_immutable(steps):
+    plan = compile_workflow(steps)
+    with pytest.raises(TypeError):
+        plan.steps[0]["id"] = "other"
+    steps[0]["id"] = "mutated"
+    assert plan.steps[0]["id"] == "check"
+
+
+def test_get_plan_is_cached(steps):
+    assert get_plan(steps) is get_plan([dict(s) for s in steps])
+
+
+def test_compile_workflow_duplicate_and_unknown_targets(steps):
+    steps[3]["id"] = "check"
+    with pytest.raises(WorkflowError) as exc:
+        compile_workflow(steps)
+    assert "Duplicate step ID 'check'" in exc.value.errors
+    assert "Step 'decide': unknown next step 'done'" in exc.value.errors
+
+
+def test_compile_workflow_unreachable_step(steps):
+    steps[1]["conditions"] = [{"default": "done"}]
+    with pytest.raises(WorkflowError) as exc:
+        compile_workflow(steps)
+    assert exc.value.errors == ["Unreachable steps: wait"]
+
+
+def test_compile_workflow_loop_without_wait(steps):
+    steps[1]["conditions"] = [
+        {"if": "output.check.status == 'Done'", "next": "done"},
+        {"default": "check"},
+    ]
+    steps.pop(2)
+    with pytest.raises(WorkflowError) as exc:
+        compile_workflow(steps)
+    assert exc.value.errors == ["Loop without a wait step: check -> decide -> check"]
+
+
+def test_compile_workflow_loop_through_wait_is_allowed(steps):
+    steps.insert(
+        3, {"id": "again", "type": "choice", "conditions": [{"default": "check"}]}
+    )
+    steps[1]["conditions"][0]["next"] = "done"
+    plan = compile_workflow(steps)
+    assert plan.successors[3] == (0,)
+
+
+def test_compile_workflow_empty_and_unsupported():
+    with pytest.raises(WorkflowError):
+        compile_workflow([])
+    with pytest.raises(WorkflowError) as exc:
+        compile_workflow([{"id": "a", "type": "lambda"}])
+    assert exc.value.errors == ["Step 'a': unsupported type 'lambda'"]
+
+
+def test_compile_workflow_signal_step(steps):
+    steps[2] = {
+        "id": "wait",
+        "type": "wait_for_signal",
+        "timeout": "60",
+        "on_timeout": "check",
+    }
+    plan = compile_workflow(steps)
+    assert plan.successors[2] == (3, 0)
+
+    steps[2]["on_timeout"] = "nowhere"
+    with pytest.raises(WorkflowError) as exc:
+        compile_workflow(steps)
+    assert exc.value.errors == ["Step 'wait': unknown next step 'nowhere'"]
+
+
+def test_plan_reaches(steps):
+    plan = compile_workflow(steps)
+    assert plan.reaches(0, "wait")
+    assert plan.reaches(1, "wait")  # Through the choice's default branch
+    assert not plan.reaches(3, "wait")
+    assert not plan.reaches(4, "task")  # Finished
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import StatementError
+
+from core import writer
+from core.writer import StateWriter
+from db.models import Job
+
+
+@pytest.fixture
+def session_factory(session_factory):
+    session = session_factory()
+    for i in range(50):
+        session.add(Job(id=f"job-{i}", workflow_name="wf", status="RUNNING"))
+    session.commit()
+    session.close()
+    return session_factory
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_share_one_transaction(session_factory, mocker):
+    spy = mocker.spy(writer, "_write_rows")
+    state_writer = StateWriter(batch_size=100, flush_interval_ms=20)
+
+    await asyncio.gather(
+        *(
+            state_writer.write(f"job-{i}", {"status": "COMPLETED", "context": {"i": i}})
+            for i in range(50)
+        )
+    )
+
+    await state_writer.close()
+
+    assert spy.call_count == 1
+    session = session_factory()
+    jobs = session.query(Job).all()
+    assert {job.status for job in jobs} == {"COMPLETED"}
+    assert session.get(Job, "job-7").context == {"i": 7}
+
+
+@pytest.mark.asyncio
+async def test_updates_to_one_job_are_merged(session_factory):
+    state_writer = StateWriter(batch_size=100, flush_interval_ms=20)
+    context = {"step": 1}
+
+    await state_writer.write("job-1", {"context": context}, durable=False)
+    context["step"] = 2  # non-durable writes are snapshotted
+    await state_writer.write("job-1", {"status": "WAITING"})
+    await state_writer.close()
+
+    job = session_factory().get(Job, "job-1")
+    assert job.context == {"step": 1}
+    assert job.status == "WAITING"
+
+
+@pytest.mark.asyncio
+async def test_failed_job_does_not_fail_the_batch(session_factory):
+    state_writer = StateWriter(batch_size=100, flush_interval_ms=20)
+
+    results = await asyncio.gather(
+        state_writer.write("job-1", {"status": "COMPLETED"}),
+        state_writer.write("job-2", {"context": {"bad": object()}}),
+        state_writer.write("missing", {"status": "COMPLETED"}),
+        return_exceptions=True,
+    )
+    await state_writer.close()
+
+    assert results[0] is None
+    assert isinstance(results[1], StatementError)
+    assert results[2] is None
+    assert session_factory().get(Job, "job-1").status == "COMPLETED"
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_pending_writes(session_factory):
+    state_writer = StateWriter(batch_size=100, flush_interval_ms=1000)
+
+    await state_writer.write("job-3", {"status": "FAILED"}, durable=False)
+    await state_writer.close()
+
+    assert session_factory().get(Job, "job-3").status == "FAILED"
+
+
+@pytest.mark.asyncio
+async def test_status_writes_do_not_undo_a_stop_request(session_factory):
+    session = session_factory()
+    session.get(Job, "job-1").status = "PAUSING"
+    session.get(Job, "job-2").status = "CANCELLING"
+    session.commit()
+    state_writer = StateWriter(batch_size=100, flush_interval_ms=20)
+
+    results = await asyncio.gather(
+        state_writer.write("job-1", {"status": "WAITING", "context": {"n": 1}}),
+        state_writer.write("job-2", {"status": "COMPLETED"}),
+        state_writer.write("job-3", {"status": "WAITING"}),
+    )
+    await state_writer.close()
+
+    assert results == ["PAUSING", None, None]
+    session.expire_all()
+    job = session.get(Job, "job-1")
+    assert job.status == "PAUSING"
+    assert job.context == {"n": 1}  # Only the status is held back
+    assert session.get(Job, "job-2").status == "COMPLETED"
+    assert session.get(Job, "job-3").status == "WAITING"
@@ -0,0 +1,69 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.schema import CreateTable
+
+from db.models import Job
+from db.session import create_db_engine, get_db, pool_stats, session_scope
+
+
+def test_sqlite_file_engine_applies_pragmas(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'karya.db'}")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+    assert engine.pool.size() == 5
+    assert engine.pool._max_overflow == 0
+    engine.dispose()
+
+
+def test_sqlite_memory_engine_shares_one_connection():
+    engine = create_db_engine("sqlite://")
+    assert isinstance(engine.pool, StaticPool)
+
+
+def test_job_json_columns_use_jsonb_on_postgresql():
+    ddl = str(CreateTable(Job.__table__).compile(dialect=postgresql.dialect()))
+    assert "context JSONB" in ddl
+    assert "steps JSONB" in ddl
+
+
+def test_get_db_closes_session(mocker):
+    mock_db = MagicMock()
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
+
+    dependency = get_db()
+    assert next(dependency) is mock_db
+    dependency.close()
+
+    mock_db.close.assert_called_once()
+
+
+def test_session_scope_rolls_back_on_error(mocker):
+    mock_db = MagicMock()
+    mocker.patch("db.session.SessionLocal", return_value=mock_db)
+
+    with pytest.raises(ValueError):
+        with session_scope():
+            raise ValueError("boom")
+
+    mock_db.commit.assert_not_called()
+    mock_db.rollback.assert_called_once()
+    mock_db.close.assert_called_once()
+
+
+def test_pool_stats_track_checkouts(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'karya.db'}")
+    before = pool_stats.snapshot()
+    with engine.connect():
+        assert pool_stats.snapshot()["connections_in_use"] == (
+            before["connections_in_use"] + 1
+        )
+    after = pool_stats.snapshot()
+    assert after["connections_in_use"] == before["connections_in_use"]
+    assert after["checkouts"] == before["checkouts"] + 1
+    engine.dispose()